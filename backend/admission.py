@@ -0,0 +1,158 @@
+import math
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_WAIT_SECONDS = Histogram(
+    'admission_wait_seconds', 'Time lookups spent queued for a browser slot',
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+)
+ADMISSION_REJECTIONS = Counter('admission_rejections_total', 'Lookups turned away by admission control', ['reason'])
+
+
+class AdmissionRejected(Exception):
+    """Raised when a lookup cannot be admitted; retry_after is a suggested wait in seconds"""
+
+    def __init__(self, message, reason, retry_after):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    def __init__(self, client_id):
+        self.client_id = client_id
+        self.granted = False
+        self.rejected = None
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """Caps concurrent live lookups, with a bounded, per-client fair wait queue.
+
+    Waiting lookups are queued per client and freed slots are handed out
+    round-robin across clients, so one busy team cannot starve the others.
+    A client may hold at most ``max_queue_per_client`` queued lookups.
+    If ``memory_check`` is given, a lookup is only admitted while it returns
+    True, both on arrival and when a freed slot would be handed to it.
+    """
+
+    def __init__(self, max_active=2, max_queue=10, max_queue_per_client=3, queue_timeout=30, memory_check=None):
+        self.max_active = max_active
+        self.memory_check = memory_check
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queued = 0
+        self._waiting = OrderedDict()  # client_id -> deque of tickets, in round-robin order
+        self._service_time = 30.0  # moving average of slot hold time, for Retry-After
+        self._lock = threading.Lock()
+
+    def _retry_after(self):
+        """Seconds until a slot is likely to free up (caller holds the lock)"""
+        waves = (self._queued + 1) / max(1, self.max_active)
+        return max(1, min(120, math.ceil(self._service_time * waves)))
+
+    def _reject(self, message, reason):
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        logger.warning("🚦 Admission rejected (%s): %s", reason, message)
+        raise AdmissionRejected(message, reason, self._retry_after())
+
+    def acquire(self, client_id, timeout=None):
+        """Wait for a slot; returns the seconds spent queued or raises AdmissionRejected"""
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        started = time.monotonic()
+        short_of_memory = self.memory_check is not None and not self.memory_check()
+
+        with self._lock:
+            if short_of_memory:
+                self._reject("not enough memory for another browser session", 'memory')
+            if self._active < self.max_active and not self._queued:
+                self._active += 1
+                ADMISSION_WAIT_SECONDS.observe(0)
+                return 0.0
+            if self._queued >= self.max_queue:
+                self._reject(f"{self._queued} lookups already queued", 'queue_full')
+            client_queue = self._waiting.get(client_id)
+            if client_queue and len(client_queue) >= self.max_queue_per_client:
+                self._reject(f"client already has {len(client_queue)} lookups queued", 'client_limit')
+
+            ticket = _Ticket(client_id)
+            if client_queue is None:
+                client_queue = self._waiting[client_id] = deque()
+            client_queue.append(ticket)
+            self._queued += 1
+
+        ticket.event.wait(timeout)
+
+        with self._lock:
+            if ticket.rejected:
+                self._reject("not enough memory for another browser session", ticket.rejected)
+            if not ticket.granted:
+                client_queue = self._waiting.get(client_id)
+                if client_queue is not None:
+                    client_queue.remove(ticket)
+                    if not client_queue:
+                        del self._waiting[client_id]
+                self._queued -= 1
+                self._reject(f"no browser slot within {timeout:.0f}s", 'queue_timeout')
+
+        waited = time.monotonic() - started
+        ADMISSION_WAIT_SECONDS.observe(waited)
+        return waited
+
+    def release(self, held_for=None):
+        """Free a slot and hand it to the next client in round-robin order"""
+        # Memory may have run out while lookups were queued; checked outside the lock
+        short_of_memory = self._waiting and self.memory_check is not None and not self.memory_check()
+        with self._lock:
+            if held_for is not None:
+                self._service_time = 0.8 * self._service_time + 0.2 * held_for
+            self._active -= 1
+            if short_of_memory:
+                # Turn every waiter away, as a new arrival would be; otherwise they would sit
+                # in the queue with no release left to wake them
+                for client_queue in self._waiting.values():
+                    for ticket in client_queue:
+                        self._queued -= 1
+                        ticket.rejected = 'memory'
+                        ticket.event.set()
+                self._waiting.clear()
+            while self._active < self.max_active and self._waiting:
+                client_id, client_queue = self._waiting.popitem(last=False)
+                ticket = client_queue.popleft()
+                if client_queue:
+                    # Back of the rotation: other clients go first next time
+                    self._waiting[client_id] = client_queue
+                self._queued -= 1
+                self._active += 1
+                ticket.granted = True
+                ticket.event.set()
+
+    @contextmanager
+    def admit(self, client_id, timeout=None):
+        """Hold a lookup slot for the duration of the block; yields the queue wait in seconds"""
+        waited = self.acquire(client_id, timeout)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_active': self.max_active,
+                'active': self._active,
+                'queued': self._queued,
+                'max_queue': self.max_queue,
+                'clients_waiting': len(self._waiting),
+                'retry_after': self._retry_after(),
+            }
@@ -0,0 +1,171 @@
+"""End-to-end latency benchmark for VoterInfoBot, run offline against the IEC stand-in.
+
+Runs N lookups at a given concurrency through real headless Chrome, using
+StubSolver instead of 2Captcha, and reports p50/p95/p99 per step and overall.
+
+Usage:
+    python benchmark.py --start-standin --lookups 50 --concurrency 4 --results-delay 1
+    python benchmark.py --url http://127.0.0.1:8765/pw/Voter/Voter-Information --no-pool --json
+"""
+import json
+import math
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+from voter_bot import VoterInfoBot
+from deadline import Deadline
+from driver_pool import DriverPool
+from iec_standin import StubSolver, FORM_PATH, create_standin_app, add_standin_arguments, config_from_args
+
+DEFAULT_ID_NUMBER = '8001015009087'
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def start_standin(config, host='127.0.0.1', port=0):
+    """Serve the stand-in from a background thread; returns (server, form_url)"""
+    server = make_server(host, port, create_standin_app(config), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="iec-standin", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}{FORM_PATH}"
+
+
+def run_benchmark(url, lookups, concurrency, id_number=DEFAULT_ID_NUMBER,
+                  solver_delay=0.0, use_pool=True, deadline_seconds=90):
+    """Run the lookups and return one sample dict per lookup"""
+    def make_bot():
+        return VoterInfoBot(solver=StubSolver(delay=solver_delay), voter_info_url=url)
+
+    pool = DriverPool(make_bot, size=concurrency, max_uses=max(lookups, 1)) if use_pool else None
+    if pool:
+        pool.warm()
+
+    def one_lookup(_):
+        started = time.monotonic()
+        deadline = Deadline(deadline_seconds)
+        timings = {}
+        record = None
+        try:
+            if pool:
+                with pool.checkout() as bot:
+                    timings['driver_checkout'] = time.monotonic() - started
+                    record = bot.run_bot(id_number, deadline=deadline)
+                    timings.update(bot.timings)
+            else:
+                bot = make_bot()
+                timings['driver_setup'] = time.monotonic() - started
+                try:
+                    record = bot.run_bot(id_number, deadline=deadline)
+                    timings.update(bot.timings)
+                finally:
+                    bot.close()
+        except Exception as e:
+            print(f"Lookup failed: {e}")
+        timings['total'] = time.monotonic() - started
+        return {'ok': bool(record and record.found), 'timings': timings}
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(one_lookup, range(lookups)))
+    finally:
+        if pool:
+            pool.close()
+
+
+def summarise(samples, wall_time):
+    """Per-step and overall latency percentiles for successful lookups"""
+    succeeded = [sample for sample in samples if sample['ok']]
+    series = {}
+    for sample in succeeded:
+        for step, seconds in sample['timings'].items():
+            series.setdefault(step, []).append(seconds)
+
+    stages = {}
+    for step, values in series.items():
+        stages[step] = {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+        }
+
+    return {
+        'lookups': len(samples),
+        'succeeded': len(succeeded),
+        'failed': len(samples) - len(succeeded),
+        'wall_time': wall_time,
+        'throughput_per_minute': 60 * len(succeeded) / wall_time if wall_time else 0,
+        'stages': stages,
+    }
+
+
+def print_report(summary):
+    print(f"Lookups: {summary['lookups']}  succeeded: {summary['succeeded']}  failed: {summary['failed']}")
+    print(f"Wall time: {summary['wall_time']:.2f}s  throughput: {summary['throughput_per_minute']:.1f} lookups/min")
+    print(f"{'stage':<18}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    stages = summary['stages']
+    # Keep 'total' last so the per-step rows read top to bottom
+    for step in [name for name in stages if name != 'total'] + ['total']:
+        if step not in stages:
+            continue
+        row = stages[step]
+        print(f"{step:<18}{row['count']:>7}{row['mean']:>10.3f}{row['p50']:>10.3f}{row['p95']:>10.3f}{row['p99']:>10.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark VoterInfoBot against the local IEC stand-in")
+    parser.add_argument('--url', help="Voter-Information form URL of an already running stand-in")
+    parser.add_argument('--start-standin', action='store_true', help="Start an in-process stand-in on a free port")
+    parser.add_argument('--lookups', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--id-number', default=DEFAULT_ID_NUMBER)
+    parser.add_argument('--solver-delay', type=float, default=0.0, help="Seconds the stub solver takes per CAPTCHA")
+    parser.add_argument('--deadline', type=float, default=90, help="Per-lookup deadline in seconds")
+    parser.add_argument('--no-pool', action='store_true', help="Launch a fresh browser per lookup instead of pooling")
+    parser.add_argument('--json', action='store_true', help="Print the summary as JSON")
+    add_standin_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not args.url and not args.start_standin:
+        parser.error("pass --url or --start-standin")
+
+    server = None
+    url = args.url
+    if args.start_standin:
+        server, url = start_standin(config_from_args(args))
+
+    try:
+        started = time.monotonic()
+        samples = run_benchmark(
+            url, args.lookups, args.concurrency,
+            id_number=args.id_number,
+            solver_delay=args.solver_delay,
+            use_pool=not args.no_pool,
+            deadline_seconds=args.deadline,
+        )
+        summary = summarise(samples, time.monotonic() - started)
+    finally:
+        if server:
+            server.shutdown()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
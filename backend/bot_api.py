@@ -1,524 +1,505 @@
 import os
+import sys
+import json
 import time
 import logging
+import threading
 from datetime import datetime
-from flask import Flask, request, jsonify
+from startup import StartupClock
+
+# Started before the web stack is imported so import_seconds covers it
+STARTUP = StartupClock()
+
+from flask import Blueprint, Flask, Response, request, jsonify, g
 from flask_cors import CORS
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from twocaptcha import TwoCaptcha  # This import will work with 2captcha-python
-from dotenv import load_dotenv
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from config import (
+    DRIVER_POOL_SIZE, DRIVER_MAX_USES, DRIVER_CHECKOUT_TIMEOUT, DRIVER_MAX_RSS_MB, DRIVER_MAX_AGE,
+    MEMORY_SAMPLE_INTERVAL, VERIFY_DEADLINE_SECONDS, RESULT_CACHE_BACKEND, RESULT_CACHE_TTL,
+    RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_PATH, DATABASE_URL, RESULT_STORE_BATCH_SIZE,
+    RESULT_STORE_FLUSH_INTERVAL, RESULT_STORE_MAX_AGE, RESULT_STORE_CONNECT_TIMEOUT, RESULT_STORE_READ_TIMEOUT,
+    ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUE,
+    ADMISSION_MAX_QUEUE_PER_CLIENT, ADMISSION_QUEUE_TIMEOUT, JOB_WORKERS, JOB_MAX_QUEUED,
+    JOB_RETENTION_SECONDS, EVENT_STREAM_MAX, BROWSER_MODE, JOB_QUEUE_PATH, JOB_LEASE_SECONDS, WORKER_CONCURRENCY,
+    LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE
+)
+from driver_pool import DriverPool, DriverPoolTimeout
+from deadline import Deadline, DeadlineExceeded
+from result_cache import create_result_cache
+from result_store import create_result_store, BatchedWriter, ReadBreaker
+from singleflight import SingleFlight
+from jobs import JobManager, JobQueueFull
+from job_queue import SQLiteJobQueue
+from browser_worker import BrowserWorker
+from metrics import REGISTRY, CONTENT_TYPE, Counter, Gauge, Histogram
+from id_validation import validate_id_number
+from browser import resolve_chromedriver
+from admission import AdmissionController, AdmissionRejected
+from memory_budget import MemoryBudget, MB
+from structured_logging import configure_logging, flush_logging, log_context
+
+# Configure logging: JSON lines written off the request path, tagged with the request id
+configure_logging(LOG_LEVEL, LOG_FORMAT, max_queued=LOG_QUEUE_SIZE)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Selenium, webdriver-manager and 2Captcha live in voter_bot and are only imported
+# by processes that drive browsers (see load_browser_stack)
+api = Blueprint('api', __name__)
 
-class VoterInfoBot:
-    def __init__(self):
-        self.driver = None
-        self.wait = None
-        # Use the correct package name
-        self.solver = TwoCaptcha(os.getenv('TWO_CAPTCHA_API_KEY', '6a618c70ab1c170d5ee4706d077cfbda'))
-        self.setup_driver()
-        
-    def setup_driver(self):
-        """Setup Chrome driver for Railway deployment"""
-        try:
-            logger.info("🛠️ Setting up Chrome driver for Railway...")
-            
-            chrome_options = Options()
-            
-            # Railway-specific Chrome options
-            chrome_options.add_argument("--headless=new")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--remote-debugging-port=9222")
-            
-            # Additional options for stability
-            chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-            chrome_options.add_argument("--disable-software-rasterizer")
-            
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # Use webdriver-manager for automatic driver management
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.wait = WebDriverWait(self.driver, 25)
-            
-            logger.info("✅ Chrome driver setup successful")
-            
-        except Exception as e:
-            logger.error(f"❌ Chrome driver setup failed: {e}")
-            raise
-
-    # [Keep all the other methods the same as before]
-    def run_bot(self, id_number):
-        """Main function to run the bot and extract voter information"""
-        try:
-            logger.info(f"🚀 Starting Voter Information Bot for ID: {id_number}")
-            
-            steps = [
-                ("🌐 Navigating to IEC website", self.navigate_to_site),
-                ("🔢 Entering ID number", lambda: self.enter_id_number(id_number)),
-                ("🔍 Finding reCAPTCHA", self.find_recaptcha_elements),
-                ("🔄 Solving reCAPTCHA", self.solve_recaptcha_v2),
-                ("📤 Submitting form", self.submit_form),
-                ("⏳ Waiting for results", self.wait_for_results_page),
-                ("📊 Extracting information", self.extract_voter_information)
-            ]
-            
-            for step_name, step_func in steps:
-                logger.info(step_name)
-                result = step_func()
-                if not result:
-                    logger.error(f"❌ Failed at: {step_name}")
-                    return None
-                time.sleep(2)  # Brief pause between steps
-            
-            voter_data = self.extract_voter_information()
-            return voter_data
-            
-        except Exception as e:
-            logger.error(f"❌ Bot execution failed: {e}")
-            return None
-    
-    def navigate_to_site(self):
-        try:
-            self.driver.get("https://www.elections.org.za/pw/Voter/Voter-Information")
-            time.sleep(5)
-            
-            if "Voter Information" in self.driver.title or "Voter Information" in self.driver.page_source:
-                logger.info("✅ IEC website loaded successfully")
-                return True
-            else:
-                logger.warning("⚠️ IEC website may not have loaded correctly")
-                return True
-                
-        except Exception as e:
-            logger.error(f"❌ Navigation failed: {e}")
-            return False
-    
-    def enter_id_number(self, id_number):
-        try:
-            logger.info("Looking for ID input field...")
-            time.sleep(2)
-            
-            id_selectors = [
-                "#MainContent_uxIDNumberTextBox",
-                "input[name='ctl00$MainContent$uxIDNumberTextBox']",
-                "input[type='tel']",
-                "input[placeholder*='ID number']",
-                "input[maxlength='13']"
-            ]
-            
-            id_input = None
-            for selector in id_selectors:
-                try:
-                    id_input = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    logger.info(f"✅ Found ID input using: {selector}")
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not id_input:
-                logger.error("❌ Could not find ID input field")
-                return False
-            
-            logger.info(f"Entering ID number: {id_number}")
-            id_input.clear()
-            id_input.send_keys(id_number)
-            
-            entered_value = id_input.get_attribute('value')
-            if entered_value == id_number:
-                logger.info("✅ ID number entered successfully")
-                return True
-            else:
-                logger.error(f"❌ ID number entry failed. Expected: {id_number}, Got: {entered_value}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error entering ID: {e}")
-            return False
+VERIFICATION_SECONDS = Histogram('voter_verification_seconds', 'End-to-end verification time', ['outcome'])
+VERIFICATIONS = Counter('voter_verifications_total', 'Verifications by outcome', ['outcome'])
+CACHE_RESULTS = Counter('voter_result_cache_total', 'Verifications by cache status', ['status'])
+
+
+def load_browser_stack():
+    """Import the Selenium/2Captcha side of the app; cheap after the first call"""
+    import voter_bot
+    return voter_bot
+
+def create_bot():
+    """DriverPool factory: a new VoterInfoBot, importing the browser stack on first use"""
+    return load_browser_stack().VoterInfoBot()
+
+def __getattr__(name):
+    # Keeps `from bot_api import VoterInfoBot` working without importing Selenium eagerly
+    if name == 'VoterInfoBot':
+        return load_browser_stack().VoterInfoBot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Resolve chromedriver before serving so a missing driver fails the boot, not a user request;
+# in queue mode only the browser workers need it. Under preload_app this runs once, before fork
+if BROWSER_MODE != 'queue':
+    resolve_chromedriver()
+
+# Browsers are launched lazily (or by warm()) inside each worker process
+driver_pool = DriverPool(
+    create_bot,
+    size=DRIVER_POOL_SIZE,
+    max_uses=DRIVER_MAX_USES,
+    checkout_timeout=DRIVER_CHECKOUT_TIMEOUT,
+    max_age=DRIVER_MAX_AGE or None,
+    max_rss=int(DRIVER_MAX_RSS_MB * MB) or None
+)
+
+# Live lookups are only admitted while projected memory stays under the container budget
+memory_budget = MemoryBudget.from_env()
+
+result_cache = create_result_cache(
+    RESULT_CACHE_BACKEND,
+    ttl=RESULT_CACHE_TTL,
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    path=RESULT_CACHE_PATH
+)
+
+# Every verified result is also written, off the request path, to the durable store
+result_store = create_result_store(DATABASE_URL, connect_timeout=RESULT_STORE_CONNECT_TIMEOUT)
+store_reads = ReadBreaker()
+result_writer = BatchedWriter(
+    result_store,
+    batch_size=RESULT_STORE_BATCH_SIZE,
+    flush_interval=RESULT_STORE_FLUSH_INTERVAL
+) if result_store else None
+
+in_flight_lookups = SingleFlight()
+
+# Open /events streams in this process; each one holds a gunicorn thread
+event_streams = threading.BoundedSemaphore(EVENT_STREAM_MAX)
+
+admission = AdmissionController(
+    max_active=ADMISSION_MAX_ACTIVE,
+    max_queue=ADMISSION_MAX_QUEUE,
+    max_queue_per_client=ADMISSION_MAX_QUEUE_PER_CLIENT,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    memory_check=memory_budget.admits
+)
+
+def lookup_voter(id_number, deadline, refresh=False, on_step=None, timings=None, client_id='anonymous', retries=None):
+    """Return (voter_data, cache_status), answering from the cache unless refresh is set
+
+    Stage durations of a live lookup are added to the timings dict, and the
+    keys of steps retried on the browser to the retries list, if given.
+    client_id is the requester used for fair admission to a browser slot.
+    """
+    if not refresh:
+        cached = result_cache.get(id_number)
+        if cached is not None:
+            logger.info("⚡ Returning cached voter information")
+            return cached, 'hit'
+        stored = load_stored_result(id_number, deadline)
+        if stored is not None:
+            logger.info("🗄️ Returning stored voter information")
+            result_cache.set(id_number, stored)
+            return stored, 'store'
     
-    def find_recaptcha_elements(self):
-        try:
-            logger.info("Looking for reCAPTCHA...")
-            
-            recaptcha_selectors = [
-                "iframe[src*='google.com/recaptcha']",
-                "iframe[src*='recaptcha']",
-                ".g-recaptcha",
-                "#g-recaptcha",
-                "div[class*='recaptcha']",
-                "iframe[title*='recaptcha']"
-            ]
-            
-            for selector in recaptcha_selectors:
-                try:
-                    recaptcha_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    logger.info(f"✅ Found reCAPTCHA element using: {selector}")
-                    return recaptcha_element
-                except NoSuchElementException:
-                    continue
-            
-            logger.error("❌ Could not find reCAPTCHA elements")
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Error finding reCAPTCHA: {e}")
-            return None
+    # Duplicate requests for an ID already being looked up share that lookup
+    try:
+        voter_data, shared = in_flight_lookups.do(
+            id_number,
+            lambda: run_live_lookup(id_number, deadline, on_step, timings, client_id, retries),
+            timeout=deadline.remaining()
+        )
+    except TimeoutError:
+        raise DeadlineExceeded("Timed out waiting for an in-flight lookup of the same ID")
     
-    def get_recaptcha_site_key(self):
-        try:
-            logger.info("Extracting reCAPTCHA site key...")
-            
-            # Method 1: Look for site key in iframe src
-            iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-            for iframe in iframes:
-                src = iframe.get_attribute('src') or ''
-                if 'recaptcha' in src:
-                    if 'k=' in src:
-                        import urllib.parse as urlparse
-                        parsed = urlparse.urlparse(src)
-                        params = urlparse.parse_qs(parsed.query)
-                        if 'k' in params:
-                            site_key = params['k'][0]
-                            logger.info(f"✅ Found reCAPTCHA site key: {site_key}")
-                            return site_key
-            
-            # Method 2: Look for data-sitekey attribute
-            sitekey_selectors = [
-                "div[data-sitekey]",
-                ".g-recaptcha[data-sitekey]",
-                "*[data-sitekey]"
-            ]
-            
-            for selector in sitekey_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        site_key = element.get_attribute('data-sitekey')
-                        if site_key and len(site_key) > 10:
-                            logger.info(f"✅ Found reCAPTCHA site key: {site_key}")
-                            return site_key
-                except NoSuchElementException:
-                    continue
-            
-            # Method 3: Search in page source
-            page_source = self.driver.page_source
-            import re
-            sitekey_patterns = [
-                r'data-sitekey="([^"]+)"',
-                r'sitekey[\'"]?\s*[:=]\s*[\'"]([^\'"]+)[\'"]',
-                r'recaptcha.*?[\'"]([a-zA-Z0-9_-]{40})[\'"]'
-            ]
-            
-            for pattern in sitekey_patterns:
-                matches = re.search(pattern, page_source)
-                if matches:
-                    site_key = matches.group(1)
-                    logger.info(f"✅ Found reCAPTCHA site key: {site_key}")
-                    return site_key
-            
-            logger.error("❌ Could not find reCAPTCHA site key")
-            return None
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting site key: {e}")
-            return None
+    if shared:
+        logger.info("🔗 Shared result of an in-flight lookup")
+        cache_status = 'coalesced'
+    else:
+        cache_status = 'refresh' if refresh else 'miss'
     
-    def solve_recaptcha_v2(self):
-        try:
-            logger.info("Starting reCAPTCHA v2 solving...")
-            
-            site_key = self.get_recaptcha_site_key()
-            if not site_key:
-                logger.error("No reCAPTCHA site key found")
-                return False
-            
-            page_url = self.driver.current_url
-            
-            logger.info(f"Solving reCAPTCHA v2 - Site Key: {site_key}, URL: {page_url}")
-            
+    if not voter_data:
+        return None, cache_status
+    return dict(voter_data), cache_status
+
+def run_live_lookup(id_number, deadline, on_step=None, timings=None, client_id='anonymous', retries=None):
+    """Run the bot on a pooled browser and cache a successful result"""
+    timings = {} if timings is None else timings
+    retries = [] if retries is None else retries
+    with admission.admit(client_id, timeout=deadline.remaining()) as waited:
+        timings['admission_wait'] = round(waited, 3)
+        started = time.monotonic()
+        with driver_pool.checkout(timeout=deadline.remaining(DRIVER_CHECKOUT_TIMEOUT)) as bot:
+            timings['driver_checkout'] = round(time.monotonic() - started, 3)
             try:
-                logger.info("Sending to 2Captcha service (this may take 10-30 seconds)...")
-                result = self.solver.recaptcha(
-                    sitekey=site_key,
-                    url=page_url,
-                    version='v2'
-                )
-                
-                recaptcha_token = result['code']
-                logger.info("✅ reCAPTCHA solved successfully")
-                
-                script = """
-                var selectors = [
-                    '#g-recaptcha-response',
-                    '[name="g-recaptcha-response"]',
-                    'textarea[name="g-recaptcha-response"]',
-                    '.g-recaptcha-response'
-                ];
-                
-                for (var i = 0; i < selectors.length; i++) {
-                    var element = document.querySelector(selectors[i]);
-                    if (element) {
-                        element.style.display = '';
-                        element.innerHTML = arguments[0];
-                        element.value = arguments[0];
-                        
-                        var event = new Event('change', { bubbles: true });
-                        element.dispatchEvent(event);
-                    }
-                }
-                return true;
-                """
-                
-                success = self.driver.execute_script(script, recaptcha_token)
-                if success:
-                    logger.info("✅ reCAPTCHA token injected successfully")
-                    time.sleep(2)
-                    return True
-                else:
-                    logger.error("❌ Failed to inject reCAPTCHA token")
-                    return False
-                
-            except Exception as e:
-                logger.error(f"2Captcha reCAPTCHA solving error: {e}")
-                return False
-            
-        except Exception as e:
-            logger.error(f"reCAPTCHA solving failed: {e}")
-            return False
+                record = bot.run_bot(id_number, deadline=deadline, on_step=on_step)
+            finally:
+                timings.update(bot.timings)
+                retries.extend(bot.retries)
     
-    def submit_form(self):
-        try:
-            logger.info("Looking for submit button...")
-            
-            submit_selectors = [
-                "input[type='submit']",
-                "button[type='submit']",
-                "input[value*='Submit']",
-                "input[value*='submit']",
-                "input[value*='Search']",
-                "input[value*='search']",
-                "button[onclick*='submit']",
-                "#MainContent_uxSubmitButton",
-                "#MainContent_btnSubmit",
-                "input[id*='Submit']",
-                "button[id*='Submit']",
-                "button[class*='btn-primary']",
-                "input[class*='btn-primary']",
-                "input[onclick*='submit']"
-            ]
-            
-            for selector in submit_selectors:
-                try:
-                    submit_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    logger.info(f"✅ Found submit button using: {selector}")
-                    
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit_button)
-                    time.sleep(1)
-                    
-                    try:
-                        submit_button.click()
-                        logger.info("✅ Form submitted using regular click")
-                    except:
-                        self.driver.execute_script("arguments[0].click();", submit_button)
-                        logger.info("✅ Form submitted using JavaScript click")
-                    
-                    time.sleep(3)
-                    return True
-                except NoSuchElementException:
-                    continue
-            
-            logger.error("❌ Could not find submit button")
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Error submitting form: {e}")
-            return False
+    # Never cache or store a page without voter data; the next call should scrape again
+    if not record or not record.found:
+        return None
     
-    def wait_for_results_page(self):
-        try:
-            logger.info("Waiting for results page to load...")
-            time.sleep(5)
-            
-            results_indicators = [
-                (By.ID, "MainContent_uxIDNumberDataField"),
-                (By.ID, "MainContent_uxWardDataField"), 
-                (By.ID, "MainContent_uxVDDataField"),
-                (By.XPATH, "//div[contains(@class, 'form-row')]"),
-                (By.XPATH, "//label[contains(@id, 'DataField')]")
-            ]
-            
-            for by, selector in results_indicators:
-                try:
-                    element = WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located((by, selector))
-                    )
-                    logger.info(f"✅ Results page indicator found: {selector}")
-                    return True
-                except TimeoutException:
-                    continue
-            
-            current_url = self.driver.current_url
-            if "My-ID-Information-Details" in current_url:
-                logger.info("✅ On results page (URL confirmed)")
-                return True
-            else:
-                logger.warning(f"Current URL: {current_url}")
-                
-            logger.error("❌ Results page not detected")
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Error waiting for results page: {e}")
-            return False
+    voter_data = record.to_dict()
+    result_cache.set(id_number, voter_data)
+    if result_writer:
+        result_writer.submit(id_number, voter_data, timings)
+    return voter_data
+
+def load_stored_result(id_number, deadline):
+    """Recent result from the durable store, or None; a store outage only costs a live lookup"""
+    if not result_store or not store_reads.allows():
+        return None
+    try:
+        stored = result_store.latest(id_number, RESULT_STORE_MAX_AGE, timeout=deadline.remaining(RESULT_STORE_READ_TIMEOUT))
+    except Exception as e:
+        store_reads.failed()
+        logger.warning("⚠️ Result store read failed: %s", e)
+        return None
+    store_reads.succeeded()
+    return stored
+
+def client_id_for(req):
+    """Identify the requester for fair admission by the client IP our proxy saw.
+
+    Only the last X-Forwarded-For entry, appended by Railway's proxy, is used;
+    earlier entries and X-Client-Id are set by the client and could be rotated
+    to get around the per-client queue cap.
+    """
+    forwarded = req.headers.get('X-Forwarded-For')
+    if forwarded:
+        return forwarded.split(',')[-1].strip() or 'anonymous'
+    return req.remote_addr or 'anonymous'
+
+def wants_refresh(data):
+    """A lookup bypasses the cache with {"refresh": true} or ?refresh=1"""
+    flag = data.get('refresh', request.args.get('refresh', ''))
+    return flag is True or str(flag).lower() in ('1', 'true', 'yes')
+
+def parse_id_number(data):
+    """Return (id_number, error_message) for a verification request body"""
+    if not data:
+        return None, 'No JSON data provided'
+        
+    id_number = data.get('id_number')
     
-    def extract_voter_information(self):
-        try:
-            logger.info("Extracting voter information...")
-            
-            voter_data = {
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'identity_number': 'Not found',
-                'full_name': 'Not found',
-                'ward': 'Not found', 
-                'voting_district': 'Not found',
-                'ward_number': 'Not found',
-                'municipality': 'Not found',
-                'province': 'Not found'
-            }
-            
-            # Extract Identity Number
-            try:
-                id_element = self.driver.find_element(By.ID, "MainContent_uxIDNumberDataField")
-                voter_data['identity_number'] = id_element.text.strip()
-                logger.info(f"✅ Identity Number: {voter_data['identity_number']}")
-            except NoSuchElementException:
-                logger.warning("Identity Number field not found")
-            
-            # Extract Ward Information
-            try:
-                ward_element = self.driver.find_element(By.ID, "MainContent_uxWardDataField")
-                ward_text = ward_element.text.strip()
-                voter_data['ward'] = ward_text
-                logger.info(f"✅ Ward: {voter_data['ward']}")
-                
-                # Parse ward details
-                if ',' in ward_text:
-                    parts = [part.strip() for part in ward_text.split(',')]
-                    if len(parts) >= 1:
-                        voter_data['ward_number'] = parts[0]
-                    if len(parts) >= 2:
-                        voter_data['municipality'] = parts[1]
-                    if len(parts) >= 3:
-                        voter_data['province'] = parts[2]
-                        
-            except NoSuchElementException:
-                logger.warning("Ward field not found")
-            
-            # Extract Voting District
-            try:
-                vd_element = self.driver.find_element(By.ID, "MainContent_uxVDDataField")
-                voter_data['voting_district'] = vd_element.text.strip()
-                logger.info(f"✅ Voting District: {voter_data['voting_district']}")
-            except NoSuchElementException:
-                logger.warning("Voting District field not found")
-            
-            return voter_data
-            
-        except Exception as e:
-            logger.error(f"❌ Error extracting voter information: {e}")
-            return {}
+    if not id_number:
+        return None, 'ID number is required'
     
-    def close(self):
-        """Close the browser"""
-        try:
-            if self.driver:
-                self.driver.quit()
-                logger.info("🔒 Browser closed.")
-        except Exception as e:
-            logger.warning(f"⚠️ Error closing browser: {e}")
-
-@app.route('/verify-voter', methods=['POST'])
-def verify_voter():
-    """API endpoint to verify voter information"""
+    # Reject typos here rather than after a browser session and a CAPTCHA solve
+    error = validate_id_number(id_number)
+    if error:
+        return None, error
+    
+    return id_number, None
+
+def perform_verification(id_number, refresh=False, on_step=None, client_id='anonymous'):
+    """Run a verification and return (response_body, http_status)"""
     start_time = time.time()
-    bot = None
+    deadline = Deadline(VERIFY_DEADLINE_SECONDS)
+    timings = {}
+    retries = []
+    
+    def finish(outcome, body, status_code):
+        elapsed = time.time() - start_time
+        timings['total'] = round(elapsed, 3)
+        body['timings'] = timings
+        body['retries'] = len(retries)
+        VERIFICATIONS.inc(outcome=outcome)
+        VERIFICATION_SECONDS.observe(elapsed, outcome=outcome)
+        return body, status_code
     
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
-            
-        id_number = data.get('id_number')
-        
-        if not id_number:
-            return jsonify({'error': 'ID number is required'}), 400
-        
-        if len(id_number) != 13 or not id_number.isdigit():
-            return jsonify({'error': 'Invalid ID number format. Must be 13 digits.'}), 400
-        
-        # Create and run bot
-        bot = VoterInfoBot()
-        
-        # Run the bot
-        results = bot.run_bot(id_number)
+        results, cache_status = lookup_voter(
+            id_number, deadline, refresh=refresh, on_step=on_step, timings=timings, client_id=client_id,
+            retries=retries
+        )
+        CACHE_RESULTS.inc(status=cache_status)
         end_time = time.time()
         processing_time = f"{end_time - start_time:.2f} seconds"
         
         if results:
             results['processing_time'] = processing_time
             results['status'] = 'success'
-            logger.info(f"✅ Verification completed in {processing_time}")
-            return jsonify(results)
+            results['cache'] = cache_status
+            logger.info("✅ Verification completed in %s", processing_time)
+            return finish('success', results, 200)
+        elif deadline.expired:
+            return finish('timeout', {
+                'status': 'error',
+                'error': 'IEC lookup timed out, please try again'
+            }, 504)
         else:
-            return jsonify({
+            return finish('failure', {
                 'status': 'error',
                 'error': 'Failed to extract voter information from IEC website'
-            }), 500
+            }, 500)
             
+    except AdmissionRejected as e:
+        return finish('rejected', {
+            'status': 'error',
+            'error': 'Verification service is busy, please try again shortly',
+            'retry_after': e.retry_after
+        }, 429)
+        
+    except DriverPoolTimeout as e:
+        logger.warning("⚠️ No browser available: %s", e)
+        return finish('busy', {
+            'status': 'error',
+            'error': 'All browsers are busy, please try again shortly'
+        }, 503)
+        
+    except DeadlineExceeded as e:
+        logger.warning("⏰ %s", e)
+        return finish('timeout', {
+            'status': 'error',
+            'error': 'IEC lookup timed out, please try again'
+        }, 504)
+
+def run_verification_job(job):
+    """JobManager runner: the same lookup as /verify-voter, with progress recorded on the job"""
+    body, status_code = perform_verification(
+        job.id_number, refresh=job.refresh, on_step=job.record_step, client_id=job.client_id
+    )
+    if status_code == 200:
+        return body, None
+    return None, body['error']
+
+def create_job_queue():
+    return SQLiteJobQueue(
+        JOB_QUEUE_PATH,
+        lease_seconds=JOB_LEASE_SECONDS,
+        max_queued=JOB_MAX_QUEUED,
+        max_queued_per_client=ADMISSION_MAX_QUEUE_PER_CLIENT,
+        max_wait=VERIFY_DEADLINE_SECONDS,
+        retention=JOB_RETENTION_SECONDS
+    )
+
+def verify_via_queue(id_number, refresh=False, client_id='anonymous'):
+    """Queue-mode /verify-voter: enqueue for a browser worker and wait for its response"""
+    deadline = Deadline(VERIFY_DEADLINE_SECONDS)
+    try:
+        job = job_manager.submit(id_number, refresh=refresh, client_id=client_id)
+    except JobQueueFull as e:
+        logger.warning("⚠️ %s", e)
+        return {
+            'status': 'error',
+            'error': 'Too many verifications queued, please try again shortly',
+            'retry_after': e.retry_after
+        }, 429
+    logger.info("🧾 Queued verification job %s for a browser worker", job.id)
+    
+    while not deadline.expired:
+        response = job_manager.response(job.id)
+        if response:
+            return response
+        time.sleep(job_manager.poll_interval)
+    # Nobody is waiting any more; don't let a worker spend a browser and a CAPTCHA on it
+    if job_manager.cancel(job.id):
+        logger.info("🧾 Cancelled verification job %s after the deadline", job.id)
+    return {
+        'status': 'error',
+        'error': 'IEC lookup timed out, please try again',
+        'job_id': job.id
+    }, 504
+
+if BROWSER_MODE == 'queue':
+    job_manager = create_job_queue()
+else:
+    job_manager = JobManager(
+        run_verification_job,
+        max_workers=JOB_WORKERS,
+        max_queued=JOB_MAX_QUEUED,
+        retention=JOB_RETENTION_SECONDS
+    )
+
+Gauge('driver_pool_browsers', 'Pooled Chrome browsers by state', ['state'],
+      callback=lambda: {(state,): count for state, count in driver_pool.stats().items() if state != 'size'})
+Gauge('driver_pool_size', 'Configured browser pool size',
+      callback=lambda: driver_pool.size)
+Gauge('voter_lookups_in_flight', 'Distinct ID numbers currently being looked up',
+      callback=lambda: in_flight_lookups.in_flight())
+Gauge('admission_active', 'Lookups holding a browser slot',
+      callback=lambda: admission.stats()['active'])
+Gauge('admission_queued', 'Lookups waiting for a browser slot',
+      callback=lambda: admission.stats()['queued'])
+Gauge('browser_memory_bytes', 'Last sampled RSS of all pooled Chrome process trees',
+      callback=driver_pool.total_rss)
+Gauge('memory_usage_bytes', 'Container working set, or this worker\'s RSS outside a cgroup',
+      callback=memory_budget.usage)
+Gauge('app_import_seconds', 'Time taken to import the app (once per master under preload_app)',
+      callback=lambda: STARTUP.import_seconds or 0)
+Gauge('process_boot_seconds', 'Time from this process starting until it was ready to serve',
+      callback=lambda: STARTUP.boot_seconds or 0)
+Gauge('verification_jobs', 'Verification jobs by status', ['status'],
+      callback=lambda: {(status,): count for status, count in job_manager.stats().items()})
+
+@api.before_request
+def open_log_context():
+    """Tag this request's log records with its X-Request-Id (or a new id)"""
+    request_id = ''.join(c for c in request.headers.get('X-Request-Id', '') if c.isalnum() or c in '-_')[:64]
+    g.log_context = log_context(request_id or None)
+    g.request_id = g.log_context.__enter__()
+
+@api.after_request
+def add_request_id(response):
+    if 'request_id' in g:
+        response.headers['X-Request-Id'] = g.request_id
+    return response
+
+@api.teardown_request
+def close_log_context(exc):
+    # gthread reuses threads across requests, so the context must not outlive this one
+    if 'log_context' in g:
+        g.pop('log_context').__exit__(None, None, None)
+
+@api.route('/verify-voter', methods=['POST'])
+def verify_voter():
+    """API endpoint to verify voter information"""
+    try:
+        data = request.get_json()
+        id_number, error = parse_id_number(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        verify = verify_via_queue if BROWSER_MODE == 'queue' else perform_verification
+        body, status_code = verify(id_number, refresh=wants_refresh(data), client_id=client_id_for(request))
+        response = jsonify(body)
+        if 'retry_after' in body:
+            response.headers['Retry-After'] = str(body['retry_after'])
+        return response, status_code
+        
     except Exception as e:
-        logger.error(f"❌ API error: {e}")
+        logger.error("❌ API error: %s", e)
         return jsonify({
             'status': 'error',
             'error': f'Internal server error: {str(e)}'
         }), 500
-        
-    finally:
-        if bot:
-            bot.close()
 
-@app.route('/health', methods=['GET'])
+@api.route('/verify-voter/jobs', methods=['POST'])
+def submit_verification_job():
+    """Queue a verification and return its job id immediately"""
+    data = request.get_json(silent=True)
+    id_number, error = parse_id_number(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        job = job_manager.submit(id_number, refresh=wants_refresh(data), client_id=client_id_for(request))
+    except JobQueueFull as e:
+        logger.warning("⚠️ %s", e)
+        response = jsonify({
+            'status': 'error',
+            'error': 'Too many verifications queued, please try again shortly',
+            'retry_after': e.retry_after
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    
+    logger.info("🧾 Queued verification job %s", job.id)
+    body = job.to_dict()
+    body['status_url'] = f"/verify-voter/jobs/{job.id}"
+    body['events_url'] = f"/verify-voter/jobs/{job.id}/events"
+    return jsonify(body), 202
+
+@api.route('/verify-voter/jobs/<job_id>', methods=['GET'])
+def get_verification_job(job_id):
+    """Current status, step and result of a verification job"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@api.route('/verify-voter/jobs/<job_id>/events', methods=['GET'])
+def stream_verification_job(job_id):
+    """Server-Sent Events stream of a job's step progress, ending when the job finishes"""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if not event_streams.acquire(blocking=False):
+        response = jsonify({
+            'status': 'error',
+            'error': 'Too many progress streams open, poll the job status instead',
+            'status_url': f"/verify-voter/jobs/{job_id}",
+            'retry_after': 2
+        })
+        response.headers['Retry-After'] = '2'
+        return response, 503
+    
+    def generate():
+        seen = 0
+        while True:
+            events = job.wait_for_events(seen, timeout=15)
+            if not events and not job.finished:
+                yield ": keep-alive\n\n"
+                continue
+            seen += len(events)
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            if job.finished and seen == len(job.events):
+                return
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Released when the stream ends or the client goes away, even if it never started
+    response.call_on_close(event_streams.release)
+    return response
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@api.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy', 
         'service': 'Voter Verification API',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'browser_mode': BROWSER_MODE,
+        'driver_pool': driver_pool.stats(),
+        'result_cache': result_cache.stats(),
+        'result_store': result_writer.stats() if result_writer else None,
+        'in_flight_lookups': in_flight_lookups.in_flight(),
+        'jobs': job_manager.stats(),
+        'admission': admission.stats(),
+        'memory': {**memory_budget.stats(), 'browsers': driver_pool.memory()},
+        'startup': STARTUP.stats()
     })
 
-@app.route('/', methods=['GET'])
+@api.route('/', methods=['GET'])
 def home():
     """Home endpoint with API information"""
     return jsonify({
@@ -526,11 +507,52 @@ def home():
         'version': '1.0.0',
         'endpoints': {
             'POST /verify-voter': 'Verify voter information with IEC',
-            'GET /health': 'Health check'
+            'POST /verify-voter/jobs': 'Queue a verification and return a job id',
+            'GET /verify-voter/jobs/<id>': 'Verification job status and result',
+            'GET /verify-voter/jobs/<id>/events': 'Server-Sent Events stream of job progress',
+            'GET /health': 'Health check',
+            'GET /metrics': 'Prometheus metrics'
         }
     })
 
-if __name__ == '__main__':
+def create_app():
+    """Build the Flask app; the lookup state above is shared by every app in the process"""
+    app = Flask(__name__)
+    # Enable CORS for all routes; the Vercel frontend reads Retry-After on a 429
+    CORS(app, expose_headers=['Retry-After', 'X-Request-Id'])
+    app.register_blueprint(api)
+    return app
+
+def start_browsers():
+    """Per-process browser setup, run after fork: orphan reaping, pool warm-up and memory sampling"""
+    load_browser_stack().chrome_supervisor.start()
+    driver_pool.warm_async()
+    driver_pool.monitor_async(MEMORY_SAMPLE_INTERVAL)
+
+def run_browser_worker():
+    """Entry point for `python bot_api.py worker`: run browsers for jobs queued by the web process"""
+    resolve_chromedriver()
+    start_browsers()
+    STARTUP.ready()
+    worker = BrowserWorker(create_job_queue(), perform_verification, concurrency=WORKER_CONCURRENCY)
+    try:
+        worker.run()
+    finally:
+        driver_pool.close()
+        if result_writer:
+            result_writer.flush(timeout=10)
+        flush_logging()
+
+app = create_app()
+STARTUP.imported()
+
+if __name__ == '__main__' and sys.argv[1:2] == ['worker']:
+    run_browser_worker()
+elif __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    logger.info(f"🚀 Starting Voter Verification API on port {port}...")
+    logger.info("🚀 Starting Voter Verification API on port %s...", port)
+    # In queue mode the browsers belong to the `python bot_api.py worker` processes
+    if BROWSER_MODE != 'queue':
+        start_browsers()
+    STARTUP.ready()
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,148 @@
+import os
+import logging
+import threading
+import subprocess
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+class ChromeDriverNotFound(RuntimeError):
+    """Raised at startup when no usable chromedriver binary can be found"""
+
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def _validate_chromedriver(path):
+    """Check the binary exists, is executable and actually runs"""
+    if not path or not os.path.isfile(path):
+        raise ChromeDriverNotFound(f"chromedriver not found at {path!r}")
+    if not os.access(path, os.X_OK):
+        raise ChromeDriverNotFound(f"chromedriver at {path} is not executable")
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise ChromeDriverNotFound(f"chromedriver at {path} could not be run: {e}")
+    if result.returncode != 0:
+        raise ChromeDriverNotFound(f"chromedriver at {path} exited with {result.returncode}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def resolve_chromedriver():
+    """Resolve and validate the chromedriver binary once per process.
+
+    CHROMEDRIVER_PATH wins when set; otherwise webdriver-manager downloads or
+    reuses its cached driver. The result is reused by every driver instance.
+    """
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path:
+            return _chromedriver_path
+
+        path = os.getenv('CHROMEDRIVER_PATH')
+        if path:
+            logger.info("🔧 Using configured chromedriver: %s", path)
+        else:
+            from webdriver_manager.chrome import ChromeDriverManager
+            try:
+                path = ChromeDriverManager().install()
+            except Exception as e:
+                raise ChromeDriverNotFound(f"webdriver-manager could not provide chromedriver: {e}")
+            logger.info("🔧 Using webdriver-manager chromedriver: %s", path)
+
+        version = _validate_chromedriver(path)
+        logger.info("✅ chromedriver ready: %s", version or path)
+        _chromedriver_path = path
+        return path
+
+
+def chromedriver_path():
+    """The resolved chromedriver path, resolving it now if startup has not"""
+    return _chromedriver_path or resolve_chromedriver()
+
+
+# Third-party analytics/ad hosts the IEC pages pull in but the bot never needs.
+# reCAPTCHA (google.com/recaptcha, www.gstatic.com/recaptcha) must stay reachable.
+TRACKER_URL_PATTERNS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googleadservices.com*",
+    "*facebook.net*",
+    "*connect.facebook.com*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*platform.twitter.com*",
+    "*addthis.com*",
+)
+IMAGE_URL_PATTERNS = ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*")
+FONT_URL_PATTERNS = ("*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com*", "*fonts.gstatic.com*")
+MEDIA_URL_PATTERNS = ("*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.wav*", "*.m4a*", "*.avi*")
+
+
+def _env_flag(name, default):
+    return os.getenv(name, '1' if default else '0').lower() in ('1', 'true', 'yes', 'on')
+
+
+@dataclass
+class ResourcePolicy:
+    """Which resources Chrome may load, and how lean its profile is"""
+    block_images: bool = True
+    block_fonts: bool = True
+    block_media: bool = True
+    block_trackers: bool = True
+    page_load_strategy: str = 'eager'
+    window_size: str = '1280,800'
+    extra_blocked_urls: tuple = field(default_factory=tuple)
+
+    @classmethod
+    def from_env(cls):
+        extra = os.getenv('BROWSER_BLOCK_URLS', '')
+        return cls(
+            block_images=_env_flag('BROWSER_BLOCK_IMAGES', True),
+            block_fonts=_env_flag('BROWSER_BLOCK_FONTS', True),
+            block_media=_env_flag('BROWSER_BLOCK_MEDIA', True),
+            block_trackers=_env_flag('BROWSER_BLOCK_TRACKERS', True),
+            page_load_strategy=os.getenv('BROWSER_PAGE_LOAD_STRATEGY', 'eager'),
+            window_size=os.getenv('BROWSER_WINDOW_SIZE', '1280,800'),
+            extra_blocked_urls=tuple(pattern.strip() for pattern in extra.split(',') if pattern.strip()),
+        )
+
+    def blocked_urls(self):
+        """URL patterns for CDP Network.setBlockedURLs"""
+        patterns = []
+        if self.block_images:
+            patterns.extend(IMAGE_URL_PATTERNS)
+        if self.block_fonts:
+            patterns.extend(FONT_URL_PATTERNS)
+        if self.block_media:
+            patterns.extend(MEDIA_URL_PATTERNS)
+        if self.block_trackers:
+            patterns.extend(TRACKER_URL_PATTERNS)
+        patterns.extend(self.extra_blocked_urls)
+        return patterns
+
+    def apply_to_options(self, options):
+        """Chrome switches and prefs that must be set before launch"""
+        options.page_load_strategy = self.page_load_strategy
+        options.add_argument(f"--window-size={self.window_size}")
+        if self.block_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+            })
+        if self.block_media:
+            options.add_argument("--autoplay-policy=user-gesture-required")
+
+    def apply_to_driver(self, driver):
+        """Install request blocking on a running driver via the DevTools protocol"""
+        patterns = self.blocked_urls()
+        if not patterns:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            logger.warning("⚠️ Could not install network blocking: %s", e)
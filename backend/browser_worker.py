@@ -0,0 +1,75 @@
+import os
+import signal
+import socket
+import logging
+import threading
+
+from structured_logging import log_context
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserWorker:
+    """Runs verification jobs from the durable queue in a process dedicated to browsers.
+
+    Each of ``concurrency`` threads claims one job at a time and passes it to
+    ``runner(id_number, refresh=..., on_step=..., client_id=...)``, which
+    returns ``(response_body, http_status)`` like perform_verification.
+    """
+
+    def __init__(self, queue, runner, concurrency=2, poll_interval=1.0):
+        self.queue = queue
+        self.runner = runner
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+
+    def process(self, row, worker_id):
+        job_id = row['id']
+        # The job id is what the web process logged when it queued the job
+        with log_context(job_id):
+            logger.info("🧾 Worker %s running job %s", worker_id, job_id)
+            try:
+                body, status_code = self.runner(
+                    row['id_number'],
+                    refresh=bool(row['refresh']),
+                    on_step=lambda step: self.queue.record_step(job_id, worker_id, step),
+                    client_id=row['client_id']
+                )
+            except Exception as e:
+                logger.error("❌ Verification job %s crashed: %s", job_id, e)
+                body, status_code = {'status': 'error', 'error': f'Internal server error: {str(e)}'}, 500
+            self.queue.complete(job_id, worker_id, body, status_code)
+
+    def _loop(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                row = self.queue.claim(worker_id)
+            except Exception as e:
+                logger.error("❌ Could not claim a job: %s", e)
+                row = None
+            if row is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.process(row, worker_id)
+
+    def stop(self, *_):
+        """Stop claiming jobs; lookups already running are finished first"""
+        logger.info("🛑 Browser worker stopping after in-flight jobs")
+        self._stop.set()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        threads = [
+            threading.Thread(target=self._loop, args=(f"{self.worker_id}-{n}",), name=f"browser-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        logger.info("🤖 Browser worker %s consuming jobs with %s threads", self.worker_id, self.concurrency)
+        # Wake periodically so the main thread can receive signals
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
@@ -0,0 +1,214 @@
+import os
+import time
+import shutil
+import socket
+import logging
+import tempfile
+import threading
+
+from procfs import pid_alive, cmdline, parent_map, kill_tree
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PREFIX = 'connectvote-chrome-'
+PID_FILE_SUFFIX = '.pids'
+DEFAULT_PROFILE_ROOT = os.getenv('CHROME_PROFILE_ROOT', tempfile.gettempdir())
+
+
+def free_port():
+    """Ask the OS for an unused local TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _owner_pid(name):
+    """Worker pid encoded in a profile dir or pid file name, or None"""
+    owner = name[len(PROFILE_PREFIX):].split('-', 1)[0]
+    if owner.endswith(PID_FILE_SUFFIX):
+        owner = owner[:-len(PID_FILE_SUFFIX)]
+    return int(owner) if owner.isdigit() else None
+
+
+def _read_pids(path):
+    try:
+        with open(path) as f:
+            return [int(line) for line in f if line.strip().isdigit()]
+    except OSError:
+        return []
+
+
+def _kill_profile_users(profile_dir, commands, parents):
+    """Kill every process tree started with this --user-data-dir"""
+    killed = []
+    marker = f"--user-data-dir={profile_dir}"
+    for pid, command in commands.items():
+        if marker in command:
+            killed.extend(kill_tree(pid, parents))
+    return killed
+
+
+def reap_orphans(root=DEFAULT_PROFILE_ROOT):
+    """Kill Chrome/chromedriver processes of dead workers and delete their profile dirs.
+
+    Returns (killed_pids, removed_paths).
+    """
+    killed, removed = [], []
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return killed, removed
+
+    parents = commands = None
+    for name in names:
+        if not name.startswith(PROFILE_PREFIX):
+            continue
+        owner = _owner_pid(name)
+        if owner is None or pid_alive(owner):
+            continue
+
+        if parents is None:
+            parents = parent_map()
+            commands = {pid: cmdline(pid) for pid in parents}
+
+        path = os.path.join(root, name)
+        if name.endswith(PID_FILE_SUFFIX):
+            for pid in _read_pids(path):
+                if 'chromedriver' in commands.get(pid, ''):
+                    killed.extend(kill_tree(pid, parents))
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        elif os.path.isdir(path):
+            killed.extend(_kill_profile_users(path, commands, parents))
+            shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+
+    if killed or removed:
+        logger.warning("🧹 Reaped %s orphaned Chrome processes and %s stale profile files", len(killed), len(removed))
+    return killed, removed
+
+
+class ChromeSupervisor:
+    """Gives each driver its own profile dir and reaps Chrome processes left behind by dead workers.
+
+    Profile dirs are named connectvote-chrome-<worker pid>-* and each worker
+    lists its chromedriver pids in connectvote-chrome-<worker pid>.pids, so
+    when a worker is killed without closing its browsers (e.g. by the gunicorn
+    timeout) any other worker, or the gunicorn master, can tell the leftovers
+    belong to a dead pid and clean them up.
+    """
+
+    def __init__(self, root=DEFAULT_PROFILE_ROOT, interval=300):
+        self.root = root
+        self.interval = interval
+        self._drivers = {}  # chromedriver pid -> profile dir
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _pid_file(self):
+        return os.path.join(self.root, f"{PROFILE_PREFIX}{os.getpid()}{PID_FILE_SUFFIX}")
+
+    def _write_pid_file(self):
+        """Persist tracked chromedriver pids (caller holds the lock)"""
+        path = self._pid_file()
+        if not self._drivers:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(''.join(f"{pid}\n" for pid in self._drivers))
+        os.replace(tmp_path, path)
+
+    def new_profile_dir(self):
+        """Fresh temp Chrome profile dir owned by this worker"""
+        os.makedirs(self.root, exist_ok=True)
+        return tempfile.mkdtemp(prefix=f"{PROFILE_PREFIX}{os.getpid()}-", dir=self.root)
+
+    def register(self, driver_pid, profile_dir):
+        with self._lock:
+            self._drivers[driver_pid] = profile_dir
+            self._write_pid_file()
+
+    def kill_profile_users(self, profile_dir):
+        """Kill processes still using a profile dir, including Chrome reparented after chromedriver exited"""
+        parents = parent_map()
+        commands = {pid: cmdline(pid) for pid in parents}
+        return _kill_profile_users(profile_dir, commands, parents)
+
+    def unregister(self, driver_pid, profile_dir):
+        """Forget a closed driver and delete its profile dir"""
+        with self._lock:
+            self._drivers.pop(driver_pid, None)
+            self._write_pid_file()
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    def tracked(self):
+        with self._lock:
+            return dict(self._drivers)
+
+    def reap(self):
+        """Reap other dead workers' leftovers, then this worker's own dead or stale entries"""
+        killed, removed = reap_orphans(self.root)
+
+        tracked = self.tracked()
+        for driver_pid, profile_dir in tracked.items():
+            if not pid_alive(driver_pid):
+                parents = parent_map()
+                commands = {pid: cmdline(pid) for pid in parents}
+                killed.extend(_kill_profile_users(profile_dir, commands, parents))
+                self.unregister(driver_pid, profile_dir)
+                removed.append(profile_dir)
+
+        # Profile dirs carrying our pid but predating this process belong to an
+        # earlier worker that had the same pid
+        own_prefix = f"{PROFILE_PREFIX}{os.getpid()}-"
+        in_use = set(tracked.values())
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(self.root, name)
+            if not name.startswith(own_prefix) or path in in_use:
+                continue
+            try:
+                if os.path.getmtime(path) >= self._started_at:
+                    continue
+            except OSError:
+                continue
+            parents = parent_map()
+            commands = {pid: cmdline(pid) for pid in parents}
+            killed.extend(_kill_profile_users(path, commands, parents))
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+
+        return killed, removed
+
+    def start(self):
+        """Reap now, then keep reaping every ``interval`` seconds in the background"""
+        self._started_at = time.time()
+        self.reap()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.reap()
+                except Exception as e:
+                    logger.error("❌ Chrome reaper failed: %s", e)
+
+        self._thread = threading.Thread(target=loop, name="chrome-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
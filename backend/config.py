@@ -0,0 +1,85 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '2'))
+DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '25'))
+DRIVER_CHECKOUT_TIMEOUT = float(os.getenv('DRIVER_CHECKOUT_TIMEOUT', '60'))
+
+# Browsers are recycled once their process tree passes DRIVER_MAX_RSS_MB or DRIVER_MAX_AGE
+# seconds (0 disables either); memory is sampled every MEMORY_SAMPLE_INTERVAL seconds
+DRIVER_MAX_RSS_MB = float(os.getenv('DRIVER_MAX_RSS_MB', '600'))
+DRIVER_MAX_AGE = float(os.getenv('DRIVER_MAX_AGE', '1800'))
+MEMORY_SAMPLE_INTERVAL = float(os.getenv('MEMORY_SAMPLE_INTERVAL', '15'))
+
+# Overall budget for one lookup; keep it below the gunicorn --timeout
+VERIFY_DEADLINE_SECONDS = float(os.getenv('VERIFY_DEADLINE_SECONDS', '90'))
+CAPTCHA_POLLING_INTERVAL = int(os.getenv('CAPTCHA_POLLING_INTERVAL', '5'))
+
+# Failed steps are retried on the same browser: at most STEP_MAX_RETRIES per step,
+# LOOKUP_MAX_RETRIES per lookup, and only while LOOKUP_RETRY_MIN_SECONDS remain
+LOOKUP_MAX_RETRIES = int(os.getenv('LOOKUP_MAX_RETRIES', '2'))
+STEP_MAX_RETRIES = int(os.getenv('STEP_MAX_RETRIES', '1'))
+LOOKUP_RETRY_MIN_SECONDS = float(os.getenv('LOOKUP_RETRY_MIN_SECONDS', '15'))
+
+# Step to resume from when a step fails
+STEP_RETRY_POLICY = {
+    'navigate': 'navigate',
+    'enter_id': 'navigate',            # stale or half-loaded form: reload it
+    'find_recaptcha': 'navigate',
+    'solve_recaptcha': 'solve_recaptcha',
+    'submit': 'navigate',              # a used CAPTCHA token cannot be resubmitted
+    'wait_results': 'wait_results',    # slow IEC response: keep waiting
+    'extract': 'extract',
+}
+
+RESULT_CACHE_BACKEND = os.getenv('RESULT_CACHE_BACKEND', 'memory')
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '86400'))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '5000'))
+RESULT_CACHE_PATH = os.getenv('RESULT_CACHE_PATH', 'result_cache.db')
+
+# Durable result store (postgres://... or sqlite:///path); unset disables it
+DATABASE_URL = os.getenv('DATABASE_URL')
+RESULT_STORE_BATCH_SIZE = int(os.getenv('RESULT_STORE_BATCH_SIZE', '50'))
+RESULT_STORE_FLUSH_INTERVAL = float(os.getenv('RESULT_STORE_FLUSH_INTERVAL', '2'))
+RESULT_STORE_MAX_AGE = int(os.getenv('RESULT_STORE_MAX_AGE', str(RESULT_CACHE_TTL)))
+# Reads on a cache miss are on the request path: bound them, and pause them while the database is failing
+RESULT_STORE_CONNECT_TIMEOUT = int(os.getenv('RESULT_STORE_CONNECT_TIMEOUT', '3'))
+RESULT_STORE_READ_TIMEOUT = float(os.getenv('RESULT_STORE_READ_TIMEOUT', '2'))
+
+
+# How often each worker looks for Chrome processes orphaned by dead workers
+CHROME_REAP_INTERVAL = float(os.getenv('CHROME_REAP_INTERVAL', '300'))
+
+# Live lookups allowed at once per worker, and how many may wait for a slot
+ADMISSION_MAX_ACTIVE = int(os.getenv('ADMISSION_MAX_ACTIVE', str(DRIVER_POOL_SIZE)))
+ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '10'))
+ADMISSION_MAX_QUEUE_PER_CLIENT = int(os.getenv('ADMISSION_MAX_QUEUE_PER_CLIENT', '3'))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '30'))
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', str(DRIVER_POOL_SIZE)))
+JOB_MAX_QUEUED = int(os.getenv('JOB_MAX_QUEUED', '50'))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', '3600'))
+# Each open /events stream holds a gunicorn thread until its job ends; beyond this many
+# per worker, clients are told to poll instead so threads stay free for /health
+EVENT_STREAM_MAX = int(os.getenv('EVENT_STREAM_MAX', '4'))
+
+# inline: web workers drive Chrome themselves; queue: they only enqueue into the
+# durable JOB_QUEUE_PATH queue and `python bot_api.py worker` processes run the browsers
+BROWSER_MODE = os.getenv('BROWSER_MODE', 'inline')
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', 'verification_jobs.db')
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', str(VERIFY_DEADLINE_SECONDS + 60)))
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', str(DRIVER_POOL_SIZE)))
+
+IEC_VOTER_INFO_URL = os.getenv('IEC_VOTER_INFO_URL', "https://www.elections.org.za/pw/Voter/Voter-Information")
+# '2captcha' in production; 'stub' pairs with the local IEC stand-in (iec_standin.py)
+CAPTCHA_SOLVER = os.getenv('CAPTCHA_SOLVER', '2captcha')
+
+# Logs are written by a background thread as JSON lines (or 'text'); records beyond
+# LOG_QUEUE_SIZE waiting to be written are dropped rather than stalling a lookup
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
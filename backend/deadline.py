@@ -0,0 +1,33 @@
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a lookup runs out of its overall time budget"""
+
+
+class Deadline:
+    """Overall time budget for a lookup, shared by every step that waits"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def remaining(self, cap=None):
+        """Seconds left, optionally capped by a per-step limit"""
+        remaining = max(0.0, self.expires_at - time.monotonic())
+        if cap is not None:
+            remaining = min(remaining, cap)
+        return remaining
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what="lookup"):
+        """Raise DeadlineExceeded if the budget is already spent"""
+        if self.expired:
+            raise DeadlineExceeded(f"{what} exceeded the {self.seconds:.0f}s deadline")
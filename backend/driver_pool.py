@@ -0,0 +1,245 @@
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no browser becomes available within the checkout timeout"""
+
+
+class DriverPool:
+    """Bounded pool of pre-launched VoterInfoBot instances.
+
+    Bots are checked out per lookup, reset when they are returned and
+    recycled after ``max_uses`` lookups, once older than ``max_age`` seconds,
+    once their browser's RSS (from ``bot.memory_bytes()``) passes ``max_rss``
+    bytes, or as soon as their driver fails.
+    """
+
+    def __init__(self, factory, size=2, max_uses=25, checkout_timeout=60, max_age=None, max_rss=None):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+        self.max_age = max_age
+        self.max_rss = max_rss
+        self._idle = deque()
+        self._busy = set()
+        self._starting = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+    def _create(self):
+        """Launch a new bot, keeping the pool accounting consistent on failure"""
+        try:
+            bot = self.factory()
+        except Exception:
+            with self._lock:
+                self._starting -= 1
+                self._lock.notify()
+            raise
+        bot.uses = 0
+        bot.created_at = time.monotonic()
+        bot.rss = 0
+        return bot
+
+    def warm(self):
+        """Launch browsers until the pool is full"""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + len(self._busy) + self._starting >= self.size:
+                    return
+                self._starting += 1
+            try:
+                bot = self._create()
+            except Exception as e:
+                logger.error("❌ Failed to pre-launch browser: %s", e)
+                return
+            with self._lock:
+                self._starting -= 1
+                self._idle.append(bot)
+                self._lock.notify()
+            logger.info("🔥 Browser pre-launched (%s idle)", len(self._idle))
+
+    def warm_async(self):
+        """Fill the pool in the background so startup is not blocked"""
+        thread = threading.Thread(target=self.warm, name="driver-pool-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def acquire(self, timeout=None):
+        """Check out a healthy bot, launching one if the pool is not yet full"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise DriverPoolTimeout("Driver pool is closed")
+                    if self._idle:
+                        bot = self._idle.popleft()
+                        self._busy.add(bot)
+                        launch = False
+                        break
+                    if len(self._busy) + self._starting < self.size:
+                        self._starting += 1
+                        launch = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolTimeout(f"No browser available after {timeout}s")
+                    self._lock.wait(remaining)
+
+            if launch:
+                bot = self._create()
+                with self._lock:
+                    self._starting -= 1
+                    self._busy.add(bot)
+                return bot
+
+            if bot.is_healthy():
+                return bot
+
+            logger.warning("⚠️ Idle browser failed health check, replacing it")
+            self._discard(bot)
+
+    def release(self, bot, discard=False):
+        """Return a bot to the pool, recycling it when worn out or broken"""
+        bot.uses += 1
+        if not discard:
+            bot.rss = bot.memory_bytes()
+            reason = self._recycle_reason(bot)
+            if reason:
+                logger.info("♻️ Recycling browser after %s", reason)
+                discard = True
+        if not discard and not bot.reset():
+            discard = True
+
+        if discard:
+            self._discard(bot)
+            # Replace the recycled browser so the next lookup finds a warm one
+            self.warm_async()
+            return
+
+        with self._lock:
+            self._busy.discard(bot)
+            if self._closed:
+                bot.close()
+                return
+            self._idle.append(bot)
+            self._lock.notify()
+
+    def _recycle_reason(self, bot):
+        """Why a bot is worn out, or None if it can keep serving"""
+        if bot.uses >= self.max_uses:
+            return f"{bot.uses} uses"
+        age = time.monotonic() - bot.created_at
+        if self.max_age and age >= self.max_age:
+            return f"{age:.0f}s"
+        if self.max_rss and bot.rss >= self.max_rss:
+            return f"reaching {bot.rss // MB} MB RSS"
+        return None
+
+    def sample_memory(self):
+        """Measure every browser's RSS and recycle idle ones that are too big or too old"""
+        with self._lock:
+            bots = list(self._idle) + list(self._busy)
+        for bot in bots:
+            bot.rss = bot.memory_bytes()
+
+        worn = []
+        with self._lock:
+            for bot in list(self._idle):
+                reason = self._recycle_reason(bot)
+                if reason:
+                    self._idle.remove(bot)
+                    self._busy.add(bot)
+                    worn.append((bot, reason))
+        for bot, reason in worn:
+            logger.info("♻️ Recycling idle browser after %s", reason)
+            self._discard(bot)
+        if worn:
+            self.warm_async()
+
+    def monitor_async(self, interval=15):
+        """Sample browser memory every ``interval`` seconds in the background"""
+        def loop():
+            while not self._closed:
+                time.sleep(interval)
+                try:
+                    self.sample_memory()
+                except Exception as e:
+                    logger.error("❌ Browser memory sampling failed: %s", e)
+
+        thread = threading.Thread(target=loop, name="driver-pool-memory", daemon=True)
+        thread.start()
+        return thread
+
+    def total_rss(self):
+        """Last sampled RSS of every pooled browser, in bytes"""
+        with self._lock:
+            return sum(bot.rss for bot in list(self._idle) + list(self._busy))
+
+    def memory(self):
+        """Last sampled RSS per browser and in total"""
+        now = time.monotonic()
+        with self._lock:
+            bots = [(bot, 'idle') for bot in self._idle] + [(bot, 'busy') for bot in self._busy]
+        drivers = [{
+            'state': state,
+            'rss_mb': round(bot.rss / MB, 1),
+            'age_seconds': round(now - bot.created_at),
+            'uses': bot.uses,
+        } for bot, state in bots]
+        return {
+            'drivers': drivers,
+            'total_rss_mb': round(sum(bot.rss for bot, _ in bots) / MB, 1),
+        }
+
+    def _discard(self, bot):
+        with self._lock:
+            self._busy.discard(bot)
+            self._lock.notify()
+        bot.close()
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Context manager yielding a bot that is returned to the pool afterwards"""
+        bot = self.acquire(timeout)
+        discard = False
+        try:
+            yield bot
+        except Exception as e:
+            # Imported here so processes that never drive a browser (queue-mode web) skip Selenium;
+            # anyone holding a bot has loaded it already
+            from selenium.common.exceptions import WebDriverException
+            discard = isinstance(e, WebDriverException)
+            raise
+        finally:
+            self.release(bot, discard=discard)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'busy': len(self._busy),
+                'starting': self._starting,
+            }
+
+    def close(self):
+        """Quit every idle browser; busy ones are closed when released"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+        for bot in idle:
+            bot.close()
@@ -0,0 +1,36 @@
+# Gunicorn reads this file automatically from the working directory
+
+# Import the app once in the master and fork workers from it, so each worker
+# starts with Flask, the config and (inline mode) the browser stack already loaded
+preload_app = True
+
+
+def when_ready(server):
+    """Pull the Selenium/2Captcha modules into the master before workers are forked"""
+    from bot_api import load_browser_stack, BROWSER_MODE
+    if BROWSER_MODE != 'queue':
+        load_browser_stack()
+
+
+def post_worker_init(worker):
+    """Pre-launch the browser pool once the worker has been forked"""
+    from bot_api import start_browsers, STARTUP, BROWSER_MODE
+    # Browsers run in the separate `python bot_api.py worker` processes in queue mode
+    if BROWSER_MODE != 'queue':
+        start_browsers()
+    STARTUP.ready()
+
+
+def child_exit(server, worker):
+    """Kill Chrome left behind by a worker that died (e.g. on timeout) before it could close its browsers"""
+    from chrome_supervisor import reap_orphans
+    reap_orphans()
+
+
+def worker_exit(server, worker):
+    """Give queued result writes a chance to reach the database and queued log records stderr"""
+    from bot_api import result_writer
+    from structured_logging import flush_logging
+    if result_writer:
+        result_writer.flush(timeout=10)
+    flush_logging()
@@ -0,0 +1,108 @@
+"""South African ID number validation.
+
+An ID number is YYMMDD SSSS C A Z: birth date, sequence (gender), citizenship
+(0 citizen, 1 permanent resident, 2 refugee), a legacy digit and a Luhn check
+digit. Invalid numbers are rejected before a browser or CAPTCHA solve is spent
+on them.
+
+Usage (data-quality jobs):
+    python id_validation.py ids.txt
+    python id_validation.py records.csv --column id_number
+"""
+import csv
+import sys
+import argparse
+from datetime import date
+from functools import lru_cache
+
+ID_LENGTH = 13
+CITIZENSHIP_DIGITS = frozenset('012')
+
+# Luhn: value contributed by a digit in a doubled position
+_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+_DIGIT_VALUES = {str(d): d for d in range(10)}
+
+
+def luhn_valid(digits):
+    """True if the digit string passes the Luhn checksum"""
+    values = _DIGIT_VALUES
+    total = sum(values[char] for char in digits[-1::-2])
+    total += sum(_DOUBLED[values[char]] for char in digits[-2::-2])
+    return total % 10 == 0
+
+
+@lru_cache(maxsize=100000)
+def birth_date(yymmdd, today):
+    """Return the birth date encoded as YYMMDD, or None if it is not a real past date.
+
+    The century is the latest one that does not put the birth date in the future.
+    """
+    year, month, day = int(yymmdd[:2]), int(yymmdd[2:4]), int(yymmdd[4:6])
+    for century in (2000, 1900):
+        try:
+            born = date(century + year, month, day)
+        except ValueError:
+            return None
+        if born <= today:
+            return born
+    return None
+
+
+def validate_id_number(id_number, today=None):
+    """Return None if the ID number is valid, otherwise a message saying why it is not"""
+    if not isinstance(id_number, str):
+        return 'Invalid ID number format. Must be 13 digits.'
+    if len(id_number) != ID_LENGTH or not id_number.isdigit() or not id_number.isascii():
+        return 'Invalid ID number format. Must be 13 digits.'
+    if birth_date(id_number[:6], today or date.today()) is None:
+        return 'Invalid ID number: digits 1-6 are not a valid YYMMDD birth date.'
+    if id_number[10] not in CITIZENSHIP_DIGITS:
+        return 'Invalid ID number: citizenship digit (11th) must be 0, 1 or 2.'
+    if not luhn_valid(id_number):
+        return 'Invalid ID number: check digit does not match.'
+    return None
+
+
+def validate_id_numbers(id_numbers):
+    """Validate many ID numbers, yielding (id_number, error) pairs; error is None when valid"""
+    validate = validate_id_number
+    today = date.today()
+    for id_number in id_numbers:
+        yield id_number, validate(id_number, today)
+
+
+def _read_ids(stream, column=None):
+    if column:
+        for row in csv.DictReader(stream):
+            yield (row.get(column) or '').strip()
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate South African ID numbers in bulk")
+    parser.add_argument('path', nargs='?', help="File with one ID per line, or a CSV with --column (default: stdin)")
+    parser.add_argument('--column', help="CSV column holding the ID number")
+    args = parser.parse_args(argv)
+
+    stream = open(args.path, newline='') if args.path else sys.stdin
+    checked = invalid = 0
+    try:
+        for id_number, error in validate_id_numbers(_read_ids(stream, args.column)):
+            checked += 1
+            if error:
+                invalid += 1
+                print(f"{id_number}\t{error}")
+    finally:
+        if args.path:
+            stream.close()
+
+    print(f"Checked {checked} ID numbers: {invalid} invalid", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Local stand-in for the IEC Voter-Information site.
+
+Serves replicas of the Voter-Information form and the My-ID-Information-Details
+results page with the MainContent_* element ids VoterInfoBot targets, with
+configurable delays and failure modes, so the bot can be exercised and
+benchmarked offline. Pair it with StubSolver instead of 2Captcha.
+
+Usage:
+    python iec_standin.py --port 8765 --results-delay 1.5 --error-rate 0.05
+
+Then point the bot at it with
+    IEC_VOTER_INFO_URL=http://127.0.0.1:8765/pw/Voter/Voter-Information CAPTCHA_SOLVER=stub
+"""
+import time
+import random
+import argparse
+from dataclasses import dataclass
+from html import escape
+
+from flask import Flask, request, redirect, url_for
+
+FORM_PATH = '/pw/Voter/Voter-Information'
+RESULTS_PATH = '/pw/Voter/My-ID-Information-Details'
+STUB_SITE_KEY = '6LcStandInSiteKey000000000000000000000000'
+STUB_TOKEN = 'stand-in-recaptcha-token'
+
+
+@dataclass
+class StandInConfig:
+    """Artificial latency (seconds) and failure rates (0-1) for the stand-in"""
+    form_delay: float = 0.0
+    submit_delay: float = 0.0
+    results_delay: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    missing_rate: float = 0.0
+    no_recaptcha_rate: float = 0.0
+    ward: str = 'Ward 79800123, JHB - City of Johannesburg, Gauteng'
+    voting_district: str = '32851014 - Stand-In Primary School'
+
+
+class StubSolver:
+    """Drop-in for TwoCaptcha that returns a fixed token after an optional delay"""
+
+    def __init__(self, delay=0.0, token=STUB_TOKEN):
+        self.delay = delay
+        self.token = token
+        self.recaptcha_timeout = 600
+        self.polling_interval = 0
+
+    def recaptcha(self, sitekey, url, **kwargs):
+        if self.delay:
+            time.sleep(min(self.delay, self.recaptcha_timeout))
+        return {'captchaId': 'stand-in', 'code': self.token}
+
+
+FORM_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Voter Information</title></head>
+<body>
+<form method="post" action="{action}" id="form1">
+  <div class="form-row">
+    <label for="MainContent_uxIDNumberTextBox">ID number</label>
+    <input name="ctl00$MainContent$uxIDNumberTextBox" type="tel" maxlength="13"
+           id="MainContent_uxIDNumberTextBox" placeholder="Enter your ID number" />
+  </div>
+  {recaptcha}
+  <input type="submit" name="ctl00$MainContent$uxSubmitButton" value="Search"
+         id="MainContent_uxSubmitButton" class="btn btn-primary" />
+</form>
+</body>
+</html>
+"""
+
+RECAPTCHA_WIDGET = """<div class="g-recaptcha" data-sitekey="{site_key}"></div>
+  <textarea id="g-recaptcha-response" name="g-recaptcha-response" style="display:none"></textarea>"""
+
+RESULTS_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>My ID Information Details</title></head>
+<body>
+{fields}
+</body>
+</html>
+"""
+
+RESULT_FIELDS = """<div class="form-row">
+  <span>Identity Number</span>
+  <label id="MainContent_uxIDNumberDataField">{id_number}</label>
+</div>
+<div class="form-row">
+  <span>Ward</span>
+  <label id="MainContent_uxWardDataField">{ward}</label>
+</div>
+<div class="form-row">
+  <span>Voting District</span>
+  <label id="MainContent_uxVDDataField">{voting_district}</label>
+</div>"""
+
+NOT_FOUND_FIELDS = """<div class="alert">The ID number you entered was not found on the voters' roll.</div>"""
+
+
+def create_standin_app(config=None):
+    config = config or StandInConfig()
+    app = Flask(__name__)
+
+    def pause(seconds):
+        if seconds or config.jitter:
+            time.sleep(max(0.0, seconds + random.uniform(0, config.jitter)))
+
+    @app.route(FORM_PATH, methods=['GET'])
+    def voter_information():
+        pause(config.form_delay)
+        recaptcha = ''
+        if random.random() >= config.no_recaptcha_rate:
+            recaptcha = RECAPTCHA_WIDGET.format(site_key=STUB_SITE_KEY)
+        return FORM_PAGE.format(action=FORM_PATH, recaptcha=recaptcha)
+
+    @app.route(FORM_PATH, methods=['POST'])
+    def submit():
+        pause(config.submit_delay)
+        if random.random() < config.error_rate:
+            return "<html><body><h1>Server Error</h1></body></html>", 500
+        id_number = request.form.get('ctl00$MainContent$uxIDNumberTextBox', '')
+        if request.form.get('g-recaptcha-response') != STUB_TOKEN:
+            return FORM_PAGE.format(action=FORM_PATH, recaptcha=RECAPTCHA_WIDGET.format(site_key=STUB_SITE_KEY))
+        return redirect(url_for('details', id=id_number))
+
+    @app.route(RESULTS_PATH, methods=['GET'])
+    def details():
+        pause(config.results_delay)
+        if random.random() < config.missing_rate:
+            return RESULTS_PAGE.format(fields=NOT_FOUND_FIELDS)
+        fields = RESULT_FIELDS.format(
+            id_number=escape(request.args.get('id', '')),
+            ward=escape(config.ward),
+            voting_district=escape(config.voting_district),
+        )
+        return RESULTS_PAGE.format(fields=fields)
+
+    return app
+
+
+def add_standin_arguments(parser):
+    """CLI options shared with the benchmark, which can start its own stand-in"""
+    parser.add_argument('--form-delay', type=float, default=0.0, help="Seconds before the form page is served")
+    parser.add_argument('--submit-delay', type=float, default=0.0, help="Seconds before a submit is answered")
+    parser.add_argument('--results-delay', type=float, default=0.0, help="Seconds before the results page is served")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra delay of up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of submits answered with HTTP 500")
+    parser.add_argument('--missing-rate', type=float, default=0.0, help="Fraction of results pages without voter fields")
+    parser.add_argument('--no-recaptcha-rate', type=float, default=0.0, help="Fraction of form pages without the reCAPTCHA widget")
+
+
+def config_from_args(args):
+    return StandInConfig(
+        form_delay=args.form_delay,
+        submit_delay=args.submit_delay,
+        results_delay=args.results_delay,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        missing_rate=args.missing_rate,
+        no_recaptcha_rate=args.no_recaptcha_rate,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local IEC Voter-Information stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+    create_standin_app(config_from_args(args)).run(host=args.host, port=args.port, threaded=True)
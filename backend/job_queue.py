@@ -0,0 +1,298 @@
+import json
+import time
+import uuid
+import sqlite3
+import logging
+
+from jobs import QUEUED, RUNNING, SUCCEEDED, FAILED, JobQueueFull
+
+logger = logging.getLogger(__name__)
+
+TIMED_OUT = {'status': 'error', 'error': 'IEC lookup timed out, please try again'}
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS verification_jobs ("
+    " id TEXT PRIMARY KEY,"
+    " id_number TEXT NOT NULL,"
+    " refresh INTEGER NOT NULL,"
+    " client_id TEXT NOT NULL,"
+    " status TEXT NOT NULL,"
+    " step TEXT,"
+    " response TEXT,"
+    " status_code INTEGER,"
+    " attempts INTEGER NOT NULL DEFAULT 0,"
+    " lease_owner TEXT,"
+    " lease_expires REAL,"
+    " created_at REAL NOT NULL,"
+    " started_at REAL,"
+    " finished_at REAL)",
+    "CREATE INDEX IF NOT EXISTS verification_jobs_status_idx ON verification_jobs (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS verification_jobs_client_idx ON verification_jobs (client_id, started_at)",
+    "CREATE TABLE IF NOT EXISTS verification_job_events ("
+    " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " job_id TEXT NOT NULL,"
+    " data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS verification_job_events_job_idx ON verification_job_events (job_id, seq)",
+)
+
+
+class QueuedJob:
+    """Read-through view of a job row, shaped like jobs.Job for the HTTP handlers"""
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.id = job_id
+
+    @property
+    def finished(self):
+        row = self.queue._row(self.id)
+        return row is None or row['status'] in (SUCCEEDED, FAILED)
+
+    @property
+    def events(self):
+        return self.queue.events(self.id)
+
+    def wait_for_events(self, seen, timeout):
+        """Poll until there are more than ``seen`` events or the job finishes"""
+        deadline = time.monotonic() + timeout
+        while True:
+            events = self.queue.events(self.id)
+            if len(events) > seen or self.finished or time.monotonic() >= deadline:
+                return events[seen:]
+            time.sleep(self.queue.poll_interval)
+
+    def to_dict(self):
+        return self.queue.job_dict(self.id)
+
+
+class SQLiteJobQueue:
+    """Durable verification queue shared by web and browser-worker processes through one SQLite file.
+
+    Workers claim a job with a lease. A job whose worker dies is handed to
+    another worker once the lease expires, and is failed after
+    ``max_attempts`` claims. Like AdmissionController, the queue is fair
+    across clients: a client may have at most ``max_queued_per_client`` jobs
+    waiting, and workers take the oldest job of the least recently served
+    client. A job still queued after ``max_wait`` seconds is failed rather
+    than run for a caller who has given up. The web side only enqueues and reads.
+    """
+
+    def __init__(self, path, lease_seconds=150, max_attempts=2, max_queued=50, max_queued_per_client=3,
+                 max_wait=90, retention=3600, poll_interval=0.5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.max_queued = max_queued
+        self.max_queued_per_client = max_queued_per_client
+        self.max_wait = max_wait
+        self.retention = retention
+        self.poll_interval = poll_interval
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+        with self._connect() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self, write=True):
+        # A connection per call keeps this safe across threads and forked processes
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Transaction(conn, write)
+
+    def _row(self, job_id):
+        with self._connect(write=False) as conn:
+            return conn.execute("SELECT * FROM verification_jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def _add_event(self, conn, job_id, event, **fields):
+        conn.execute(
+            "INSERT INTO verification_job_events (job_id, data) VALUES (?, ?)",
+            (job_id, json.dumps({'event': event, 'time': time.time(), **fields}))
+        )
+
+    def submit(self, id_number, refresh=False, client_id='anonymous'):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            self._prune(conn)
+            queued = conn.execute("SELECT COUNT(*) FROM verification_jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} verification jobs are already queued")
+            client_queued = conn.execute(
+                "SELECT COUNT(*) FROM verification_jobs WHERE status = ? AND client_id = ?", (QUEUED, client_id)
+            ).fetchone()[0]
+            if client_queued >= self.max_queued_per_client:
+                raise JobQueueFull(f"client already has {client_queued} verification jobs queued")
+            conn.execute(
+                "INSERT INTO verification_jobs (id, id_number, refresh, client_id, status, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, id_number, int(bool(refresh)), client_id, QUEUED, time.time())
+            )
+        return QueuedJob(self, job_id)
+
+    def get(self, job_id):
+        return QueuedJob(self, job_id) if self._row(job_id) else None
+
+    def claim(self, worker_id):
+        """Lease the next runnable job to this worker; returns its row or None
+
+        Jobs whose lease expired are reclaimed first; otherwise the client
+        whose last job started longest ago (or never) goes next.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # Jobs whose worker vanished too often are given up on
+            expired = conn.execute(
+                "SELECT id FROM verification_jobs WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (RUNNING, now, self.max_attempts)
+            ).fetchall()
+            for row in expired:
+                self._finish(conn, row['id'], {'status': 'error', 'error': 'Browser worker stopped during the lookup'}, 500)
+            self._expire_queued(conn)
+
+            row = conn.execute(
+                "SELECT job.*, (SELECT MAX(served.started_at) FROM verification_jobs served"
+                "  WHERE served.client_id = job.client_id) AS last_served"
+                " FROM verification_jobs job"
+                " WHERE job.status = ? OR (job.status = ? AND job.lease_expires < ?)"
+                " ORDER BY job.status = ? DESC, COALESCE(last_served, 0), job.created_at LIMIT 1",
+                (QUEUED, RUNNING, now, RUNNING)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['status'] == RUNNING:
+                logger.warning("⚠️ Reclaiming job %s from %s after its lease expired", row['id'], row['lease_owner'])
+            conn.execute(
+                "UPDATE verification_jobs SET status = ?, attempts = attempts + 1, lease_owner = ?,"
+                " lease_expires = ?, started_at = ? WHERE id = ?",
+                (RUNNING, worker_id, now + self.lease_seconds, now, row['id'])
+            )
+            self._add_event(conn, row['id'], 'started', status=RUNNING, started_at=now)
+        return row
+
+    def record_step(self, job_id, worker_id, step):
+        """Record progress and extend the lease"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE verification_jobs SET step = ?, lease_expires = ? WHERE id = ? AND lease_owner = ?",
+                (step, time.time() + self.lease_seconds, job_id, worker_id)
+            )
+            self._add_event(conn, job_id, 'step', step=step)
+
+    def complete(self, job_id, worker_id, body, status_code):
+        """Store the verification response, unless the lease has moved to another worker"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT lease_owner, status FROM verification_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None or row['lease_owner'] != worker_id or row['status'] != RUNNING:
+                logger.warning("⚠️ Dropping result for job %s: lease lost", job_id)
+                return
+            self._finish(conn, job_id, body, status_code)
+
+    def _finish(self, conn, job_id, body, status_code):
+        status = SUCCEEDED if status_code == 200 else FAILED
+        finished_at = time.time()
+        conn.execute(
+            "UPDATE verification_jobs SET status = ?, response = ?, status_code = ?, finished_at = ?,"
+            " lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+            (status, json.dumps(body), status_code, finished_at, job_id)
+        )
+        if status == SUCCEEDED:
+            self._add_event(conn, job_id, 'done', status=status, result=body, finished_at=finished_at)
+        else:
+            self._add_event(conn, job_id, 'done', status=status, error=body.get('error'), finished_at=finished_at)
+
+    def cancel(self, job_id):
+        """Fail a job that no worker has claimed yet, so none pays for a lookup nobody awaits"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM verification_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row['status'] != QUEUED:
+                return False
+            self._finish(conn, job_id, TIMED_OUT, 504)
+        return True
+
+    def _expire_queued(self, conn):
+        """Fail jobs that waited longer than max_wait for a worker"""
+        rows = conn.execute(
+            "SELECT id FROM verification_jobs WHERE status = ? AND created_at < ?",
+            (QUEUED, time.time() - self.max_wait)
+        ).fetchall()
+        for row in rows:
+            self._finish(conn, row['id'], TIMED_OUT, 504)
+        if rows:
+            logger.warning("⚠️ Expired %s verification jobs no worker picked up within %ss", len(rows), self.max_wait)
+
+    def response(self, job_id):
+        """(body, status_code) of a finished job, or None"""
+        row = self._row(job_id)
+        if row is None or row['status'] not in (SUCCEEDED, FAILED):
+            return None
+        return json.loads(row['response']), row['status_code']
+
+    def job_dict(self, job_id):
+        row = self._row(job_id)
+        if row is None:
+            return None
+        body = json.loads(row['response']) if row['response'] else None
+        return {
+            'job_id': row['id'],
+            'status': row['status'],
+            'step': row['step'],
+            'result': body if row['status'] == SUCCEEDED else None,
+            'error': body.get('error') if body and row['status'] == FAILED else None,
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+        }
+
+    def events(self, job_id):
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                "SELECT data FROM verification_job_events WHERE job_id = ? ORDER BY seq", (job_id,)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def _prune(self, conn):
+        """Expire stale queued jobs and forget finished jobs older than the retention window"""
+        self._expire_queued(conn)
+        cutoff = time.time() - self.retention
+        conn.execute(
+            "DELETE FROM verification_job_events WHERE job_id IN"
+            " (SELECT id FROM verification_jobs WHERE status IN (?, ?) AND finished_at < ?)",
+            (SUCCEEDED, FAILED, cutoff)
+        )
+        conn.execute(
+            "DELETE FROM verification_jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (SUCCEEDED, FAILED, cutoff)
+        )
+
+    def stats(self):
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        with self._connect(write=False) as conn:
+            for row in conn.execute("SELECT status, COUNT(*) AS n FROM verification_jobs GROUP BY status"):
+                counts[row['status']] = row['n']
+        return counts
+
+
+class _Transaction:
+    """Connection context that runs the block in one transaction and then closes.
+
+    Writers take the write lock up front (BEGIN IMMEDIATE) so two workers
+    cannot claim the same job.
+    """
+
+    def __init__(self, conn, write=True):
+        self.conn = conn
+        self.write = write
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE" if self.write else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
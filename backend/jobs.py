@@ -0,0 +1,133 @@
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """Raised when too many verification jobs are already waiting; retry_after is a suggested wait in seconds"""
+
+    def __init__(self, message, retry_after=30):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Job:
+    """A verification submitted through the job API"""
+
+    def __init__(self, id_number, refresh=False, client_id='anonymous'):
+        self.id = uuid.uuid4().hex
+        self.id_number = id_number
+        self.refresh = refresh
+        self.client_id = client_id
+        self.status = QUEUED
+        self.step = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def _update(self, event, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.events.append({'event': event, 'time': time.time(), **fields})
+            self._changed.notify_all()
+
+    def record_step(self, step):
+        """Step callback handed to the bot so pollers can follow progress"""
+        self._update('step', step=step)
+
+    def wait_for_events(self, seen, timeout):
+        """Block until there are more than ``seen`` events or the job finishes"""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > seen or self.finished, timeout)
+            return list(self.events[seen:])
+
+    def to_dict(self):
+        with self._changed:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'step': self.step,
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+
+class JobManager:
+    """Runs verification jobs on a bounded thread pool so HTTP workers never wait on Selenium.
+
+    ``runner(job)`` does the lookup, reporting progress through
+    ``job.record_step`` and returning ``(result, error)``.
+    """
+
+    def __init__(self, runner, max_workers=2, max_queued=50, retention=3600):
+        self.runner = runner
+        self.max_queued = max_queued
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="verify-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, id_number, refresh=False, client_id='anonymous'):
+        with self._lock:
+            self._prune()
+            queued = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} verification jobs are already queued")
+            job = Job(id_number, refresh=refresh, client_id=client_id)
+            self._jobs[job.id] = job
+        # Run in a copy of the submitter's context so the job logs under its request id
+        self._executor.submit(contextvars.copy_context().run, self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job._update('started', status=RUNNING, started_at=time.time())
+        try:
+            result, error = self.runner(job)
+        except Exception as e:
+            logger.error("❌ Verification job %s crashed: %s", job.id, e)
+            result, error = None, f'Internal server error: {str(e)}'
+
+        if result:
+            job._update('done', status=SUCCEEDED, result=result, finished_at=time.time())
+        else:
+            job._update('done', status=FAILED, error=error, finished_at=time.time())
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window (caller holds the lock)"""
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
@@ -0,0 +1,98 @@
+import os
+import logging
+
+from procfs import tree_rss
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# cgroup v2 files, then their v1 equivalents
+CGROUP_V2 = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current', '/sys/fs/cgroup/memory.stat', 'inactive_file')
+CGROUP_V1 = ('/sys/fs/cgroup/memory/memory.limit_in_bytes', '/sys/fs/cgroup/memory/memory.usage_in_bytes',
+             '/sys/fs/cgroup/memory/memory.stat', 'total_inactive_file')
+
+# v1 reports "no limit" as a page-aligned value close to 2**63
+UNLIMITED = 1 << 60
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def _stat_value(path, key):
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, value = line.partition(' ')
+                if name == key:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def cgroup_memory_limit():
+    """Container memory limit in bytes, or None when there is none"""
+    for limit_path, _, _, _ in (CGROUP_V2, CGROUP_V1):
+        limit = _read_int(limit_path)
+        if limit is not None:
+            return limit if limit < UNLIMITED else None
+    return None
+
+
+def cgroup_memory_usage():
+    """Container working set (usage minus reclaimable page cache) in bytes, or None"""
+    for _, usage_path, stat_path, inactive_key in (CGROUP_V2, CGROUP_V1):
+        usage = _read_int(usage_path)
+        if usage is not None:
+            return max(0, usage - _stat_value(stat_path, inactive_key))
+    return None
+
+
+class MemoryBudget:
+    """Admits a lookup only if current usage plus its expected growth stays under the budget.
+
+    Usage is the container working set when a cgroup is visible, otherwise
+    the RSS of this worker and its browsers. A budget of None admits everything.
+    """
+
+    def __init__(self, budget_bytes=None, lookup_headroom=150 * MB):
+        self.budget_bytes = budget_bytes
+        self.lookup_headroom = lookup_headroom
+
+    @classmethod
+    def from_env(cls):
+        """MEMORY_BUDGET_MB, else 90% of the container limit, else no budget"""
+        headroom = int(float(os.getenv('LOOKUP_MEMORY_HEADROOM_MB', '150')) * MB)
+        configured = os.getenv('MEMORY_BUDGET_MB')
+        if configured:
+            return cls(int(float(configured) * MB), headroom)
+        limit = cgroup_memory_limit()
+        if limit:
+            logger.info("🧠 Memory budget set to 90%% of the %s MB container limit", limit // MB)
+            return cls(int(limit * 0.9), headroom)
+        return cls(None, headroom)
+
+    def usage(self):
+        usage = cgroup_memory_usage()
+        return usage if usage is not None else tree_rss(os.getpid())
+
+    def admits(self):
+        if self.budget_bytes is None:
+            return True
+        return self.usage() + self.lookup_headroom <= self.budget_bytes
+
+    def stats(self):
+        limit = cgroup_memory_limit()
+        return {
+            'budget_mb': round(self.budget_bytes / MB) if self.budget_bytes else None,
+            'usage_mb': round(self.usage() / MB),
+            'limit_mb': round(limit / MB) if limit else None,
+            'lookup_headroom_mb': round(self.lookup_headroom / MB),
+        }
@@ -0,0 +1,99 @@
+"""Minimal Linux /proc helpers for tracking Chrome process trees (no psutil dependency)"""
+import os
+import signal
+
+PROC = '/proc'
+
+
+def pid_alive(pid):
+    """True if a process with this pid exists (zombies count as gone)"""
+    try:
+        with open(f"{PROC}/{pid}/stat") as f:
+            state = f.read().rsplit(')', 1)[1].split()[0]
+        return state != 'Z'
+    except (OSError, IndexError):
+        return False
+
+
+def cmdline(pid):
+    """Command line of a process as a single string, or '' if it is gone"""
+    try:
+        with open(f"{PROC}/{pid}/cmdline", 'rb') as f:
+            return f.read().replace(b'\0', b' ').decode(errors='replace').strip()
+    except OSError:
+        return ''
+
+
+def parent_map():
+    """Map of pid -> parent pid for every visible process"""
+    parents = {}
+    try:
+        entries = os.listdir(PROC)
+    except OSError:
+        return parents
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{PROC}/{entry}/stat") as f:
+                # The command name may contain spaces or parentheses; fields follow the last ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return parents
+
+
+def descendants(pid, parents=None):
+    """All descendant pids of a process"""
+    parents = parent_map() if parents is None else parents
+    children = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def kill_tree(pid, parents=None):
+    """SIGKILL a process and all of its descendants; returns the pids signalled"""
+    killed = []
+    for target in descendants(pid, parents) + [pid]:
+        try:
+            os.kill(target, signal.SIGKILL)
+            killed.append(target)
+        except OSError:
+            continue
+    return killed
+
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def rss_bytes(pid):
+    """Resident set size of one process, or 0 if it is gone"""
+    try:
+        with open(f"{PROC}/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def tree_rss(pid, parents=None):
+    """Summed RSS of a process and its descendants (shared pages are counted once per process)"""
+    return sum(rss_bytes(member) for member in [pid] + descendants(pid, parents))
+
+
+def process_start_time(pid):
+    """Wall-clock time a process started, or None if it cannot be read"""
+    try:
+        with open(f"{PROC}/{pid}/stat") as f:
+            ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open(f"{PROC}/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith('btime '))
+    except (OSError, IndexError, ValueError, StopIteration):
+        return None
+    return boot_time + ticks / os.sysconf('SC_CLK_TCK')
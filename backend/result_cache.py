@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Interface for caches of extracted voter data keyed by ID number"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        """Return a copy of the cached voter dict, or None if missing or expired"""
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'backend': self.backend,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class MemoryResultCache(ResultCache):
+    """In-process LRU cache with a per-entry TTL"""
+    backend = 'memory'
+
+    def __init__(self, ttl=3600, max_entries=5000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats['entries'] = len(self._entries)
+        return stats
+
+
+class SQLiteResultCache(ResultCache):
+    """SQLite-backed cache that survives process restarts.
+
+    The connection is opened per process, so a cache created before a
+    gunicorn fork (preload_app) is safe to use in every worker.
+    """
+    backend = 'sqlite'
+
+    def __init__(self, path, ttl=3600):
+        super().__init__(ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    @property
+    def _db(self):
+        """This process's connection (caller holds the lock)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn_pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                " id_number TEXT PRIMARY KEY,"
+                " voter_data TEXT NOT NULL,"
+                " stored_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT voter_data, stored_at FROM result_cache WHERE id_number = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        voter_data, stored_at = row
+        if time.time() - stored_at > self.ttl:
+            self.delete(key)
+            return None
+        return json.loads(voter_data)
+
+    def set(self, key, value):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO result_cache (id_number, voter_data, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._db.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM result_cache WHERE id_number = ?", (key,))
+            self._db.commit()
+
+
+def create_result_cache(backend='memory', ttl=3600, max_entries=5000, path='result_cache.db'):
+    """Build the configured cache backend"""
+    if backend == 'sqlite':
+        logger.info("🗄️ Using SQLite result cache at %s", path)
+        return SQLiteResultCache(path, ttl=ttl)
+    if backend != 'memory':
+        raise ValueError(f"Unknown result cache backend: {backend}")
+    return MemoryResultCache(ttl=ttl, max_entries=max_entries)
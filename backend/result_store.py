@@ -0,0 +1,369 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Rows written before results without voter data were rejected may hold this placeholder
+NOT_FOUND = 'Not found'
+
+RESULT_STORE_WRITES = Counter(
+    'result_store_writes_total', 'Verification results handed to the durable store, by outcome', ['outcome']
+)
+
+
+class ResultStore:
+    """Durable record of every successful verification, newest row per ID wins on reads"""
+    backend = None
+    # Errors worth retrying (lost connection, locked database); anything else drops the batch
+    transient_errors = ()
+
+    def write(self, rows):
+        """Insert (id_number, voter_data, timings, verified_at) rows in one transaction"""
+        raise NotImplementedError
+
+    def latest(self, id_number, max_age, timeout=None):
+        """Newest found voter dict stored for this ID within max_age seconds, or None; gives up after timeout seconds"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PostgresResultStore(ResultStore):
+    """Postgres store using a thread-safe connection pool, opened lazily so it is created after fork"""
+    backend = 'postgres'
+
+    def __init__(self, dsn, min_connections=1, max_connections=4, connect_timeout=3):
+        import psycopg2
+        self._psycopg2 = psycopg2
+        self.transient_errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+        self.dsn = dsn
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        # Another thread may be connecting; wait no longer than a connect would take
+        if not self._lock.acquire(timeout=self.connect_timeout):
+            raise self._psycopg2.OperationalError("Timed out waiting for the result store connection pool")
+        try:
+            if self._pool is None or self._pool_pid != os.getpid():
+                from psycopg2.pool import ThreadedConnectionPool
+                pool = ThreadedConnectionPool(
+                    self.min_connections, self.max_connections, self.dsn, connect_timeout=self.connect_timeout
+                )
+                # Only keep the pool once the table exists, so a failed DDL is retried on the next call
+                try:
+                    self._create_schema(pool)
+                except Exception:
+                    pool.closeall()
+                    raise
+                self._pool = pool
+                self._pool_pid = os.getpid()
+            return self._pool
+        finally:
+            self._lock.release()
+
+    def _create_schema(self, pool):
+        conn = pool.getconn()
+        try:
+            with conn, conn.cursor() as cur:
+                cur.execute(
+                    "CREATE TABLE IF NOT EXISTS voter_verifications ("
+                    " id BIGSERIAL PRIMARY KEY,"
+                    " id_number TEXT NOT NULL,"
+                    " voter_data JSONB NOT NULL,"
+                    " timings JSONB,"
+                    " source_timestamp TEXT,"
+                    " verified_at TIMESTAMPTZ NOT NULL)"
+                )
+                cur.execute(
+                    "CREATE INDEX IF NOT EXISTS voter_verifications_id_number_idx"
+                    " ON voter_verifications (id_number, verified_at DESC)"
+                )
+        finally:
+            pool.putconn(conn)
+
+    def _run(self, fn):
+        """Run fn(cursor) in a pooled transaction, discarding the connection if it broke"""
+        pool = self._get_pool()
+        conn = pool.getconn()
+        broken = False
+        try:
+            with conn, conn.cursor() as cur:
+                return fn(cur)
+        except self.transient_errors:
+            broken = True
+            raise
+        finally:
+            pool.putconn(conn, close=broken or bool(conn.closed))
+
+    def write(self, rows):
+        from psycopg2.extras import Json, execute_values
+
+        values = [
+            (id_number, Json(voter_data), Json(timings), voter_data.get('timestamp'), verified_at)
+            for id_number, voter_data, timings, verified_at in rows
+        ]
+        self._run(lambda cur: execute_values(
+            cur,
+            "INSERT INTO voter_verifications"
+            " (id_number, voter_data, timings, source_timestamp, verified_at) VALUES %s",
+            values,
+            template="(%s, %s, %s, %s, to_timestamp(%s))"
+        ))
+
+    def latest(self, id_number, max_age, timeout=None):
+        def query(cur):
+            if timeout is not None:
+                cur.execute("SET LOCAL statement_timeout = %s", (max(1, int(timeout * 1000)),))
+            cur.execute(
+                "SELECT voter_data FROM voter_verifications"
+                " WHERE id_number = %s AND verified_at > now() - make_interval(secs => %s)"
+                " AND voter_data->>'identity_number' IS DISTINCT FROM %s"
+                " ORDER BY verified_at DESC LIMIT 1",
+                (id_number, max_age, NOT_FOUND)
+            )
+            return cur.fetchone()
+
+        row = self._run(query)
+        return dict(row[0]) if row else None
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+
+
+class SQLiteResultStore(ResultStore):
+    """SQLite stand-in with the same table, for local runs and tests without Postgres.
+
+    Like the Postgres pool, the connection is opened per process so the store is fork-safe.
+    """
+    backend = 'sqlite'
+    transient_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    @property
+    def _db(self):
+        """This process's connection (caller holds the lock)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._conn_pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS voter_verifications ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " id_number TEXT NOT NULL,"
+                " voter_data TEXT NOT NULL,"
+                " timings TEXT,"
+                " source_timestamp TEXT,"
+                " verified_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS voter_verifications_id_number_idx"
+                " ON voter_verifications (id_number, verified_at DESC)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def write(self, rows):
+        values = [
+            (id_number, json.dumps(voter_data), json.dumps(timings), voter_data.get('timestamp'), verified_at)
+            for id_number, voter_data, timings, verified_at in rows
+        ]
+        with self._lock:
+            with self._db as conn:
+                conn.executemany(
+                    "INSERT INTO voter_verifications"
+                    " (id_number, voter_data, timings, source_timestamp, verified_at) VALUES (?, ?, ?, ?, ?)",
+                    values
+                )
+
+    def latest(self, id_number, max_age, timeout=None):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT voter_data FROM voter_verifications"
+                " WHERE id_number = ? AND verified_at > ?"
+                " AND json_extract(voter_data, '$.identity_number') IS NOT ?"
+                " ORDER BY verified_at DESC LIMIT 1",
+                (id_number, time.time() - max_age, NOT_FOUND)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def create_result_store(url, connect_timeout=3):
+    """Store for DATABASE_URL (postgres://... or sqlite:///path), or None when unset"""
+    if not url:
+        return None
+    if url.startswith('sqlite:///'):
+        path = url[len('sqlite:///'):]
+        logger.info("🗄️ Persisting results to SQLite at %s", path)
+        return SQLiteResultStore(path)
+    if url.startswith(('postgres://', 'postgresql://')):
+        logger.info("🗄️ Persisting results to Postgres")
+        return PostgresResultStore(url, connect_timeout=connect_timeout)
+    raise ValueError("DATABASE_URL must be a postgres:// or sqlite:/// URL")
+
+
+class ReadBreaker:
+    """Skips store reads for ``cooldown`` seconds after ``max_failures`` failed in a row.
+
+    Store reads sit on the request path; during a database outage every
+    lookup would otherwise wait out a connect or statement timeout first.
+    """
+
+    def __init__(self, max_failures=3, cooldown=30):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allows(self):
+        return time.monotonic() >= self.open_until
+
+    def succeeded(self):
+        with self._lock:
+            self.failures = 0
+
+    def failed(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.open_until = time.monotonic() + self.cooldown
+                self.failures = 0
+                logger.warning("⚠️ Result store reads paused for %ss after repeated failures", self.cooldown)
+
+
+class BatchedWriter:
+    """Writes results to a ResultStore from a background thread so requests never wait on the database.
+
+    Rows are flushed when ``batch_size`` have queued or ``flush_interval``
+    seconds after the first one arrived. A batch that hits a transient error
+    is retried with backoff up to ``max_retries`` times. When more than
+    ``max_pending`` rows are waiting, new rows are dropped rather than
+    growing memory without bound.
+    """
+
+    def __init__(self, store, batch_size=50, flush_interval=2.0, max_retries=5, max_pending=10000):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_error = None
+
+    def _ensure_started(self):
+        """Start the writer thread in this process (threads do not survive fork)"""
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="result-writer", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def submit(self, id_number, voter_data, timings=None):
+        """Queue a verified result; never blocks"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((id_number, dict(voter_data), dict(timings or {}), time.time()))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            RESULT_STORE_WRITES.inc(outcome='dropped')
+            logger.warning("⚠️ Result store backlog full, dropping a result")
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        flush_at = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = flush_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        delay = 0.5
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                self.store.write(batch)
+                with self._lock:
+                    self.written += len(batch)
+                RESULT_STORE_WRITES.inc(len(batch), outcome='written')
+                return
+            except self.store.transient_errors as e:
+                self.last_error = str(e)
+                if attempt > self.max_retries:
+                    break
+                logger.warning("⚠️ Result store write failed (attempt %s), retrying in %.1fs: %s", attempt, delay, e)
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+            except Exception as e:
+                self.last_error = str(e)
+                break
+
+        with self._lock:
+            self.failed += len(batch)
+        RESULT_STORE_WRITES.inc(len(batch), outcome='failed')
+        logger.error("❌ Dropped %s results after store write failed: %s", len(batch), self.last_error)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been written or given up on"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.store.backend,
+                'pending': self._queue.qsize(),
+                'written': self.written,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'last_error': self.last_error,
+            }
@@ -0,0 +1,65 @@
+import logging
+import threading
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_FALLBACKS = Counter(
+    'selector_probe_fallbacks_total',
+    'Probes resolved by a selector other than the remembered one (the IEC page may have changed)',
+    ['probe', 'selector']
+)
+
+PROBE_SCRIPT = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var element = document.querySelector(selectors[i]);
+    if (element) {
+        return [i, element];
+    }
+}
+return null;
+"""
+
+
+class SelectorProbe:
+    """Ordered CSS selector candidates for one page element.
+
+    All candidates are evaluated in a single execute_script round-trip, the
+    selector that last matched is tried first, and the full list is the
+    fallback when it stops matching. The remembered winner is shared by
+    every bot in the process. Instances work as WebDriverWait conditions.
+    """
+
+    def __init__(self, name, selectors):
+        self.name = name
+        self.selectors = list(selectors)
+        self._winner = None
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        with self._lock:
+            winner = self._winner
+        if winner is None:
+            return list(self.selectors)
+        return [winner] + [selector for selector in self.selectors if selector != winner]
+
+    def probe(self, driver):
+        """Return (selector, element) for the first candidate present, or None"""
+        candidates = self.candidates()
+        found = driver.execute_script(PROBE_SCRIPT, candidates)
+        if not found:
+            return None
+
+        index, element = found
+        selector = candidates[int(index)]
+        if index:
+            SELECTOR_FALLBACKS.inc(probe=self.name, selector=selector)
+            logger.info("🔀 %s matched fallback selector: %s", self.name, selector)
+        with self._lock:
+            self._winner = selector
+        return selector, element
+
+    def __call__(self, driver):
+        return self.probe(driver) or False
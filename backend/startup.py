@@ -0,0 +1,35 @@
+import os
+import time
+
+from procfs import process_start_time
+
+
+class StartupClock:
+    """Measures how long the app took to import and how long this process took to become ready.
+
+    With gunicorn ``preload_app`` the import happens once in the master and
+    forked workers only pay for post-fork setup, which shows up as a short
+    boot time and ``preloaded: true``.
+    """
+
+    def __init__(self):
+        self.import_pid = os.getpid()
+        self._import_started = time.monotonic()
+        self.import_seconds = None
+        self.boot_seconds = None
+
+    def imported(self):
+        self.import_seconds = time.monotonic() - self._import_started
+
+    def ready(self):
+        """Record the time from process start (fork, for a gunicorn worker) until now"""
+        started = process_start_time(os.getpid())
+        if started is not None:
+            self.boot_seconds = max(0.0, time.time() - started)
+
+    def stats(self):
+        return {
+            'import_seconds': round(self.import_seconds, 3) if self.import_seconds is not None else None,
+            'boot_seconds': round(self.boot_seconds, 3) if self.boot_seconds is not None else None,
+            'preloaded': os.getpid() != self.import_pid,
+        }
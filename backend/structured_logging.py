@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+from metrics import Counter
+
+LOG_RECORDS_DROPPED = Counter('log_records_dropped_total', 'Log records dropped because the log queue was full')
+
+# Request context carried into every record logged while a lookup runs
+REQUEST_ID = contextvars.ContextVar('request_id', default=None)
+STEP = contextvars.ContextVar('step', default=None)
+STARTED = contextvars.ContextVar('started', default=None)
+
+# SA ID numbers are 13 digits; only the last four are kept in logs
+ID_NUMBER_PATTERN = re.compile(r'(?<!\d)\d{9}(\d{4})(?!\d)')
+
+
+def mask_id_numbers(text):
+    return ID_NUMBER_PATTERN.sub(r'*********\1', text)
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def log_context(request_id=None):
+    """Tag records logged inside the block with request_id (a new one if None) and elapsed time"""
+    tokens = (
+        REQUEST_ID.set(request_id or new_request_id()),
+        STEP.set(None),
+        STARTED.set(time.monotonic()),
+    )
+    try:
+        yield REQUEST_ID.get()
+    finally:
+        for var, token in zip((REQUEST_ID, STEP, STARTED), tokens):
+            var.reset(token)
+
+
+def set_step(step):
+    """Record the lookup step now running in this context"""
+    STEP.set(step)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the request context onto the record in the thread that logged it"""
+
+    def filter(self, record):
+        record.request_id = REQUEST_ID.get()
+        record.step = STEP.get()
+        started = STARTED.get()
+        record.elapsed_ms = round((time.monotonic() - started) * 1000) if started is not None else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ID numbers masked"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': mask_id_numbers(record.getMessage()),
+            'request_id': getattr(record, 'request_id', None),
+            'step': getattr(record, 'step', None),
+            'elapsed_ms': getattr(record, 'elapsed_ms', None),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exc_info'] = mask_id_numbers(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain-text lines for local runs, with the request id and ID numbers masked"""
+
+    def __init__(self):
+        super().__init__('%(levelname)s:%(name)s:%(request_id)s %(message)s')
+
+    def format(self, record):
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = '-'
+        return mask_id_numbers(super().format(record))
+
+
+class NonBlockingHandler(QueueHandler):
+    """Hands records to a background thread that formats and writes them.
+
+    The calling thread only tags the record with its context and enqueues it;
+    when more than ``max_queued`` records are waiting, new ones are dropped
+    instead of blocking a lookup. The listener thread is started lazily in
+    each process, so a handler configured before a gunicorn fork keeps working.
+    """
+
+    def __init__(self, target, max_queued=10000):
+        super().__init__(queue.Queue(maxsize=max_queued))
+        self.target = target
+        self.max_queued = max_queued
+        self.addFilter(ContextFilter())
+        self._listener = None
+        self._listener_pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._listener_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._listener_pid != os.getpid():
+                # The parent's queue and thread did not survive the fork
+                self.queue = queue.Queue(maxsize=self.max_queued)
+                self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+                self._listener.start()
+                self._listener_pid = os.getpid()
+
+    def prepare(self, record):
+        # Formatting is left to the listener; only the arguments are merged here,
+        # so objects logged by reference cannot change before they are written
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def flush(self, timeout=5):
+        """Wait until records queued so far have been written"""
+        if self._listener_pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        if self._listener_pid == os.getpid():
+            self._listener.stop()
+            self._listener_pid = None
+        super().close()
+
+
+def configure_logging(level='INFO', fmt='json', max_queued=10000):
+    """Route the root logger through a NonBlockingHandler writing JSON (or text) to stderr"""
+    stream = logging.StreamHandler()
+    stream.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    handler = NonBlockingHandler(stream, max_queued=max_queued)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    atexit.register(handler.close)
+    return handler
+
+
+def flush_logging(timeout=5):
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingHandler):
+            handler.flush(timeout)
@@ -26,6 +26,7 @@ def test_bot_standalone():
         execution_time = end_time - start_time
         
         if results:
+            results = results.to_dict()
             print("\n" + "="*60)
             print("✅ BOT TEST SUCCESSFUL!")
             print("="*60)
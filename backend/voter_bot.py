@@ -0,0 +1,598 @@
+import os
+import time
+import logging
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from twocaptcha import TwoCaptcha  # This import will work with 2captcha-python
+from selenium.webdriver.chrome.service import Service
+from config import (
+    VERIFY_DEADLINE_SECONDS, CAPTCHA_POLLING_INTERVAL, LOOKUP_MAX_RETRIES, STEP_MAX_RETRIES,
+    LOOKUP_RETRY_MIN_SECONDS, STEP_RETRY_POLICY, CHROME_REAP_INTERVAL, IEC_VOTER_INFO_URL, CAPTCHA_SOLVER
+)
+from deadline import Deadline, DeadlineExceeded
+from voter_record import VoterRecord, RESULT_FIELDS
+from metrics import Counter, Histogram
+from browser import chromedriver_path, ResourcePolicy
+from selector_probe import SelectorProbe
+from chrome_supervisor import ChromeSupervisor, free_port
+from procfs import kill_tree, tree_rss
+from structured_logging import set_step
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_POLICY = ResourcePolicy.from_env()
+
+STEP_SECONDS = Histogram('voter_lookup_step_seconds', 'Duration of each VoterInfoBot step', ['step'])
+STEP_FAILURES = Counter('voter_lookup_step_failures_total', 'Lookups that failed, by the step that failed', ['step'])
+STEP_RETRIES = Counter('voter_lookup_step_retries_total', 'Failed steps retried on the same browser', ['step'])
+DRIVER_SECONDS = Histogram('chrome_driver_lifecycle_seconds', 'Chrome driver setup and teardown time', ['phase'])
+
+RESULTS_PAGE_MARKER = "My-ID-Information-Details"
+
+# Each probe remembers its last winning selector and checks every candidate in one round-trip
+ID_INPUT_PROBE = SelectorProbe('id_input', [
+    "#MainContent_uxIDNumberTextBox",
+    "input[name='ctl00$MainContent$uxIDNumberTextBox']",
+    "input[type='tel']",
+    "input[placeholder*='ID number']",
+    "input[maxlength='13']"
+])
+
+RECAPTCHA_PROBE = SelectorProbe('recaptcha', [
+    "iframe[src*='google.com/recaptcha']",
+    "iframe[src*='recaptcha']",
+    ".g-recaptcha",
+    "#g-recaptcha",
+    "div[class*='recaptcha']",
+    "iframe[title*='recaptcha']"
+])
+
+SUBMIT_PROBE = SelectorProbe('submit_button', [
+    "input[type='submit']",
+    "button[type='submit']",
+    "input[value*='Submit']",
+    "input[value*='submit']",
+    "input[value*='Search']",
+    "input[value*='search']",
+    "button[onclick*='submit']",
+    "#MainContent_uxSubmitButton",
+    "#MainContent_btnSubmit",
+    "input[id*='Submit']",
+    "button[id*='Submit']",
+    "button[class*='btn-primary']",
+    "input[class*='btn-primary']",
+    "input[onclick*='submit']"
+])
+
+def create_solver():
+    """CAPTCHA solver selected by CAPTCHA_SOLVER"""
+    if CAPTCHA_SOLVER == 'stub':
+        from iec_standin import StubSolver
+        return StubSolver()
+    # Use the correct package name
+    return TwoCaptcha(
+        os.getenv('TWO_CAPTCHA_API_KEY', '6a618c70ab1c170d5ee4706d077cfbda'),
+        pollingInterval=CAPTCHA_POLLING_INTERVAL
+    )
+
+# Tracks this process's Chrome profiles and reaps those of dead workers
+chrome_supervisor = ChromeSupervisor(interval=CHROME_REAP_INTERVAL)
+
+class VoterInfoBot:
+    def __init__(self, solver=None, voter_info_url=None):
+        self.driver = None
+        self.wait = None
+        self.service = None
+        self.profile_dir = None
+        self.solver = solver or create_solver()
+        self.voter_info_url = voter_info_url or IEC_VOTER_INFO_URL
+        self.deadline = Deadline(VERIFY_DEADLINE_SECONDS)
+        self.timings = {}
+        self.retries = []
+        self.setup_driver()
+        
+    def setup_driver(self):
+        """Setup Chrome driver for Railway deployment"""
+        started = time.monotonic()
+        try:
+            logger.info("🛠️ Setting up Chrome driver for Railway...")
+            
+            chrome_options = Options()
+            
+            # Railway-specific Chrome options
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            chrome_options.add_argument("--disable-extensions")
+            # Own debugging port and profile per driver so several can run in one process
+            self.profile_dir = chrome_supervisor.new_profile_dir()
+            chrome_options.add_argument(f"--remote-debugging-port={free_port()}")
+            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+            
+            # Additional options for stability
+            chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+            chrome_options.add_argument("--disable-software-rasterizer")
+            
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+            
+            # Skip images, fonts, media and trackers; return from get() at DOMContentLoaded
+            RESOURCE_POLICY.apply_to_options(chrome_options)
+            
+            # Driver binary is resolved once at startup and shared by every instance
+            self.service = Service(chromedriver_path())
+            self.driver = webdriver.Chrome(service=self.service, options=chrome_options)
+            chrome_supervisor.register(self.service.process.pid, self.profile_dir)
+            
+            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            RESOURCE_POLICY.apply_to_driver(self.driver)
+            self.wait = WebDriverWait(self.driver, 25)
+            
+            DRIVER_SECONDS.observe(time.monotonic() - started, phase='setup')
+            logger.info("✅ Chrome driver setup successful")
+            
+        except Exception as e:
+            logger.error("❌ Chrome driver setup failed: %s", e)
+            self.close()
+            raise
+
+    def _wait(self, cap=None):
+        """WebDriverWait bounded by the time left on the lookup deadline"""
+        self.deadline.check()
+        return WebDriverWait(self.driver, self.deadline.remaining(cap), poll_frequency=0.2)
+
+    def run_bot(self, id_number, deadline=None, on_step=None):
+        """Main function to run the bot and extract voter information
+
+        on_step, if given, is called with each step's key as the step starts.
+        Per-step durations (summed over retries) are left in self.timings and
+        the keys of the steps that were retried in self.retries.
+        """
+        self.deadline = deadline or Deadline(VERIFY_DEADLINE_SECONDS)
+        self.timings = {}
+        self.retries = []
+        step_key = None
+        try:
+            logger.info("🚀 Starting Voter Information Bot for ID: %s", id_number)
+            
+            steps = [
+                ('navigate', "🌐 Navigating to IEC website", self.navigate_to_site),
+                ('enter_id', "🔢 Entering ID number", lambda: self.enter_id_number(id_number)),
+                ('find_recaptcha', "🔍 Finding reCAPTCHA", self.find_recaptcha_elements),
+                ('solve_recaptcha', "🔄 Solving reCAPTCHA", self.solve_recaptcha_v2),
+                ('submit', "📤 Submitting form", self.submit_form),
+                ('wait_results', "⏳ Waiting for results", self.wait_for_results_page),
+                ('extract', "📊 Extracting information", self.extract_voter_information)
+            ]
+            
+            step_index = {key: index for index, (key, _, _) in enumerate(steps)}
+            attempts = {}
+            
+            # The last step's result is the VoterRecord
+            result = None
+            index = 0
+            while index < len(steps):
+                step_key, step_name, step_func = steps[index]
+                self.deadline.check(step_name)
+                set_step(step_key)
+                logger.info(step_name)
+                if on_step:
+                    on_step(step_key)
+                started = time.monotonic()
+                try:
+                    result = step_func()
+                finally:
+                    elapsed = time.monotonic() - started
+                    self.timings[step_key] = round(self.timings.get(step_key, 0) + elapsed, 3)
+                    STEP_SECONDS.observe(elapsed, step=step_key)
+                if result:
+                    index += 1
+                    continue
+                
+                resume_at = self._retry_from(step_key, attempts)
+                if resume_at is None:
+                    logger.error("❌ Failed at: %s", step_name)
+                    STEP_FAILURES.inc(step=step_key)
+                    return None
+                logger.warning("🔁 %s failed, retrying from '%s' on the same browser", step_name, resume_at)
+                STEP_RETRIES.inc(step=step_key)
+                self.retries.append(step_key)
+                index = step_index[resume_at]
+            
+            return result
+            
+        except DeadlineExceeded as e:
+            logger.error("⏰ %s", e)
+            STEP_FAILURES.inc(step=step_key or 'start')
+            return None
+        except Exception as e:
+            logger.error("❌ Bot execution failed: %s", e)
+            STEP_FAILURES.inc(step=step_key or 'start')
+            return None
+    
+    def _retry_from(self, step_key, attempts):
+        """Step to resume from after step_key failed, or None once the retry budget is spent"""
+        resume_at = STEP_RETRY_POLICY.get(step_key)
+        attempts[step_key] = attempts.get(step_key, 0) + 1
+        if resume_at is None or attempts[step_key] > STEP_MAX_RETRIES:
+            return None
+        if len(self.retries) >= LOOKUP_MAX_RETRIES:
+            return None
+        if self.deadline.remaining() < LOOKUP_RETRY_MIN_SECONDS:
+            logger.info("⏰ Not retrying %s: only %.0fs left", step_key, self.deadline.remaining())
+            return None
+        if not self.is_healthy():
+            return None
+        return resume_at
+    
+    def navigate_to_site(self):
+        try:
+            self.driver.set_page_load_timeout(max(1, self.deadline.remaining(30)))
+            self.driver.get(self.voter_info_url)
+            
+            # Ready once the DOM is parsed and the ID field is on the page; with the
+            # eager load strategy we do not wait for subresources to finish
+            self._wait(20).until(
+                lambda driver: driver.execute_script("return document.readyState") != "loading"
+            )
+            self._wait(10).until(ID_INPUT_PROBE)
+            
+            if "Voter Information" in self.driver.title or "Voter Information" in self.driver.page_source:
+                logger.info("✅ IEC website loaded successfully")
+                return True
+            else:
+                logger.warning("⚠️ IEC website may not have loaded correctly")
+                return True
+                
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error("❌ Navigation failed: %s", e)
+            return False
+    
+    def enter_id_number(self, id_number):
+        try:
+            logger.info("Looking for ID input field...")
+            
+            try:
+                selector, id_input = self._wait(10).until(ID_INPUT_PROBE)
+                logger.info("✅ Found ID input using: %s", selector)
+            except TimeoutException:
+                logger.error("❌ Could not find ID input field")
+                return False
+            
+            logger.info("Entering ID number: %s", id_number)
+            id_input.clear()
+            id_input.send_keys(id_number)
+            
+            entered_value = id_input.get_attribute('value')
+            if entered_value == id_number:
+                logger.info("✅ ID number entered successfully")
+                return True
+            else:
+                logger.error("❌ ID number entry failed. Expected: %s, Got: %s", id_number, entered_value)
+                return False
+                
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error("❌ Error entering ID: %s", e)
+            return False
+    
+    def find_recaptcha_elements(self):
+        try:
+            logger.info("Looking for reCAPTCHA...")
+            
+            try:
+                selector, recaptcha_element = self._wait(15).until(RECAPTCHA_PROBE)
+                logger.info("✅ Found reCAPTCHA element using: %s", selector)
+                return recaptcha_element
+            except TimeoutException:
+                logger.error("❌ Could not find reCAPTCHA elements")
+                return None
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error("❌ Error finding reCAPTCHA: %s", e)
+            return None
+    
+    def get_recaptcha_site_key(self):
+        try:
+            logger.info("Extracting reCAPTCHA site key...")
+            
+            # Method 1: Look for site key in iframe src
+            iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
+            for iframe in iframes:
+                src = iframe.get_attribute('src') or ''
+                if 'recaptcha' in src:
+                    if 'k=' in src:
+                        import urllib.parse as urlparse
+                        parsed = urlparse.urlparse(src)
+                        params = urlparse.parse_qs(parsed.query)
+                        if 'k' in params:
+                            site_key = params['k'][0]
+                            logger.info("✅ Found reCAPTCHA site key: %s", site_key)
+                            return site_key
+            
+            # Method 2: Look for data-sitekey attribute
+            sitekey_selectors = [
+                "div[data-sitekey]",
+                ".g-recaptcha[data-sitekey]",
+                "*[data-sitekey]"
+            ]
+            
+            for selector in sitekey_selectors:
+                try:
+                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    for element in elements:
+                        site_key = element.get_attribute('data-sitekey')
+                        if site_key and len(site_key) > 10:
+                            logger.info("✅ Found reCAPTCHA site key: %s", site_key)
+                            return site_key
+                except NoSuchElementException:
+                    continue
+            
+            # Method 3: Search in page source
+            page_source = self.driver.page_source
+            import re
+            sitekey_patterns = [
+                r'data-sitekey="([^"]+)"',
+                r'sitekey[\'"]?\s*[:=]\s*[\'"]([^\'"]+)[\'"]',
+                r'recaptcha.*?[\'"]([a-zA-Z0-9_-]{40})[\'"]'
+            ]
+            
+            for pattern in sitekey_patterns:
+                matches = re.search(pattern, page_source)
+                if matches:
+                    site_key = matches.group(1)
+                    logger.info("✅ Found reCAPTCHA site key: %s", site_key)
+                    return site_key
+            
+            logger.error("❌ Could not find reCAPTCHA site key")
+            return None
+            
+        except Exception as e:
+            logger.error("❌ Error getting site key: %s", e)
+            return None
+    
+    def solve_recaptcha_v2(self):
+        try:
+            logger.info("Starting reCAPTCHA v2 solving...")
+            
+            site_key = self.get_recaptcha_site_key()
+            if not site_key:
+                logger.error("No reCAPTCHA site key found")
+                return False
+            
+            page_url = self.driver.current_url
+            
+            logger.info("Solving reCAPTCHA v2 - Site Key: %s, URL: %s", site_key, page_url)
+            
+            # Never wait on 2Captcha longer than the lookup has left
+            self.deadline.check("reCAPTCHA solving")
+            self.solver.recaptcha_timeout = self.deadline.remaining()
+            
+            try:
+                logger.info("Sending to 2Captcha service (this may take 10-30 seconds)...")
+                result = self.solver.recaptcha(
+                    sitekey=site_key,
+                    url=page_url,
+                    version='v2'
+                )
+                
+                recaptcha_token = result['code']
+                logger.info("✅ reCAPTCHA solved successfully")
+                
+                script = """
+                var selectors = [
+                    '#g-recaptcha-response',
+                    '[name="g-recaptcha-response"]',
+                    'textarea[name="g-recaptcha-response"]',
+                    '.g-recaptcha-response'
+                ];
+                
+                for (var i = 0; i < selectors.length; i++) {
+                    var element = document.querySelector(selectors[i]);
+                    if (element) {
+                        element.style.display = '';
+                        element.innerHTML = arguments[0];
+                        element.value = arguments[0];
+                        
+                        var event = new Event('change', { bubbles: true });
+                        element.dispatchEvent(event);
+                    }
+                }
+                return true;
+                """
+                
+                success = self.driver.execute_script(script, recaptcha_token)
+                if success:
+                    logger.info("✅ reCAPTCHA token injected successfully")
+                    return True
+                else:
+                    logger.error("❌ Failed to inject reCAPTCHA token")
+                    return False
+                
+            except Exception as e:
+                logger.error("2Captcha reCAPTCHA solving error: %s", e)
+                return False
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error("reCAPTCHA solving failed: %s", e)
+            return False
+    
+    def submit_form(self):
+        try:
+            logger.info("Looking for submit button...")
+            
+            try:
+                selector, submit_button = self._wait(5).until(SUBMIT_PROBE)
+                logger.info("✅ Found submit button using: %s", selector)
+            except TimeoutException:
+                logger.error("❌ Could not find submit button")
+                return False
+            
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit_button)
+            
+            try:
+                submit_button.click()
+                logger.info("✅ Form submitted using regular click")
+            except:
+                self.driver.execute_script("arguments[0].click();", submit_button)
+                logger.info("✅ Form submitted using JavaScript click")
+            
+            # The postback replaces the page, so wait for the old button to go stale
+            try:
+                self._wait(30).until(
+                    lambda driver: RESULTS_PAGE_MARKER in driver.current_url
+                    or EC.staleness_of(submit_button)(driver)
+                )
+            except TimeoutException:
+                logger.warning("⚠️ Page did not change after submitting")
+            return True
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error("❌ Error submitting form: %s", e)
+            return False
+    
+    def wait_for_results_page(self):
+        try:
+            logger.info("Waiting for results page to load...")
+            
+            results_indicators = [
+                (By.ID, "MainContent_uxIDNumberDataField"),
+                (By.ID, "MainContent_uxWardDataField"), 
+                (By.ID, "MainContent_uxVDDataField"),
+                # The ID form page has form-row divs too, so generic layout markers are not enough
+                (By.XPATH, "//*[starts-with(@id, 'MainContent_') and contains(@id, 'DataField')]")
+            ]
+            
+            # Any single indicator is enough, so poll for all of them at once
+            try:
+                self._wait(30).until(EC.any_of(
+                    EC.url_contains(RESULTS_PAGE_MARKER),
+                    *[EC.presence_of_element_located(locator) for locator in results_indicators]
+                ))
+                logger.info("✅ Results page indicator found")
+                return True
+            except TimeoutException:
+                pass
+            
+            current_url = self.driver.current_url
+            if RESULTS_PAGE_MARKER in current_url:
+                logger.info("✅ On results page (URL confirmed)")
+                return True
+            else:
+                logger.warning("Current URL: %s", current_url)
+                
+            logger.error("❌ Results page not detected")
+            return False
+            
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error("❌ Error waiting for results page: %s", e)
+            return False
+    
+    def extract_voter_information(self):
+        """Read every result field in a single round-trip and return a VoterRecord"""
+        try:
+            logger.info("Extracting voter information...")
+            
+            fields = self.driver.execute_script("""
+                var out = {};
+                arguments[0].forEach(function (id) {
+                    var element = document.getElementById(id);
+                    out[id] = element ? element.innerText.trim() : null;
+                });
+                return out;
+            """, RESULT_FIELDS)
+            
+            for field_id in RESULT_FIELDS:
+                if fields.get(field_id) is None:
+                    logger.warning("%s not found", field_id)
+            
+            record = VoterRecord.from_fields(fields)
+            if not record.found:
+                logger.error("❌ Results page held no voter information")
+                return None
+            logger.info("✅ Identity Number: %s", record.identity_number)
+            logger.info("✅ Ward: %s", record.ward)
+            logger.info("✅ Voting District: %s", record.voting_district)
+            return record
+            
+        except Exception as e:
+            logger.error("❌ Error extracting voter information: %s", e)
+            return None
+    
+    def memory_bytes(self):
+        """RSS of chromedriver and every Chrome process under it"""
+        process = getattr(self.service, 'process', None)
+        return tree_rss(process.pid) if process else 0
+    
+    def is_healthy(self):
+        """Check that the browser session still responds"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException as e:
+            logger.warning("⚠️ Browser health check failed: %s", e)
+            return False
+        except Exception as e:
+            logger.warning("⚠️ Browser health check error: %s", e)
+            return False
+
+    def reset(self):
+        """Clear cookies and storage so the browser can serve the next lookup"""
+        try:
+            self.driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning("⚠️ Browser reset failed: %s", e)
+            return False
+
+    def close(self):
+        """Close the browser"""
+        try:
+            if self.driver:
+                started = time.monotonic()
+                self.driver.quit()
+                DRIVER_SECONDS.observe(time.monotonic() - started, phase='teardown')
+                logger.info("🔒 Browser closed.")
+        except Exception as e:
+            logger.warning("⚠️ Error closing browser: %s", e)
+        finally:
+            self._release_processes()
+
+    def _release_processes(self):
+        """Kill anything quit() left running and delete the profile dir"""
+        process = getattr(self.service, 'process', None)
+        killed = []
+        # poll(), not the pid: once chromedriver has been reaped its pid may belong to someone else
+        if process and process.poll() is None:
+            killed.extend(kill_tree(process.pid))
+        # A hung Chrome outlives chromedriver and is reparented, so find it by its profile dir,
+        # which must happen before unregister() deletes that dir
+        if self.profile_dir:
+            killed.extend(chrome_supervisor.kill_profile_users(self.profile_dir))
+        if killed:
+            logger.warning("🧹 Killed %s Chrome processes left after quit", len(killed))
+        if process or self.profile_dir:
+            chrome_supervisor.unregister(process.pid if process else None, self.profile_dir)
+        self.service = None
+        self.profile_dir = None
@@ -0,0 +1,73 @@
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+
+from ward_index import normalise_ward
+
+NOT_FOUND = 'Not found'
+
+# Element ids on the IEC My-ID-Information-Details page
+ID_NUMBER_FIELD = "MainContent_uxIDNumberDataField"
+WARD_FIELD = "MainContent_uxWardDataField"
+VOTING_DISTRICT_FIELD = "MainContent_uxVDDataField"
+RESULT_FIELDS = [ID_NUMBER_FIELD, WARD_FIELD, VOTING_DISTRICT_FIELD]
+
+
+@dataclass
+class VoterRecord:
+    """Voter information extracted from the IEC results page"""
+    timestamp: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    identity_number: str = NOT_FOUND
+    full_name: str = NOT_FOUND
+    ward: str = NOT_FOUND
+    voting_district: str = NOT_FOUND
+    ward_number: str = NOT_FOUND
+    ward_id: str = NOT_FOUND
+    municipality: str = NOT_FOUND
+    municipality_code: str = NOT_FOUND
+    province: str = NOT_FOUND
+    province_code: str = NOT_FOUND
+
+    @classmethod
+    def from_fields(cls, fields):
+        """Build a record from the raw text of the results page fields, keyed by element id"""
+        record = cls()
+
+        if fields.get(ID_NUMBER_FIELD) is not None:
+            record.identity_number = fields[ID_NUMBER_FIELD]
+
+        ward_text = fields.get(WARD_FIELD)
+        if ward_text is not None:
+            record.ward = ward_text
+            # Parse ward details
+            if ',' in ward_text:
+                parts = [part.strip() for part in ward_text.split(',')]
+                if len(parts) >= 1:
+                    record.ward_number = parts[0]
+                if len(parts) >= 2:
+                    record.municipality = parts[1]
+                if len(parts) >= 3:
+                    record.province = parts[2]
+            # Prefer canonical ids and names wherever the ward index resolves them
+            ward = normalise_ward(ward_text)
+            if ward.ward_id != NOT_FOUND:
+                record.ward_id = ward.ward_id
+                record.ward_number = ward.ward_no
+            if ward.municipality_code != NOT_FOUND:
+                record.municipality_code = ward.municipality_code
+                record.municipality = ward.municipality
+            if ward.province_code != NOT_FOUND:
+                record.province_code = ward.province_code
+                record.province = ward.province
+
+        if fields.get(VOTING_DISTRICT_FIELD) is not None:
+            record.voting_district = fields[VOTING_DISTRICT_FIELD]
+
+        return record
+
+    @property
+    def found(self):
+        """False when the page held no voter data, e.g. the form re-served after a rejected CAPTCHA"""
+        return self.identity_number != NOT_FOUND
+
+    def to_dict(self):
+        return asdict(self)
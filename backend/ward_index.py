@@ -0,0 +1,213 @@
+"""Ward -> municipality -> province reference index for normalising scraped ward text.
+
+IEC ward ids are 8 digits: the first digit is the province, the next two
+the district (metros have their own), the next two the local municipality
+(00 for a metro) and the last three the ward, e.g. 79800123 is ward 123 of
+the City of Johannesburg in Gauteng and 10203001 is ward 1 of a Cape
+Winelands municipality. The index maps 5-digit municipality prefixes through
+a 100000-slot array, so normalising a record is a regex match and two array
+lookups. Six of the eight metros are bundled: Cape Town, Nelson Mandela
+Bay, eThekwini, Ekurhuleni, Johannesburg and Tshwane, but not Buffalo City
+or Mangaung. Extend the table with a CSV of prefix,code,name rows (5-digit
+prefixes) via WARD_INDEX_PATH.
+
+Usage (renormalise captured records):
+    python ward_index.py records.csv --column ward > normalised.csv
+"""
+import os
+import re
+import csv
+import sys
+import argparse
+from array import array
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+
+NOT_FOUND = 'Not found'
+
+# Indexed by the first digit of the ward id
+PROVINCES = (
+    None,
+    ('WC', 'Western Cape'),
+    ('EC', 'Eastern Cape'),
+    ('NC', 'Northern Cape'),
+    ('FS', 'Free State'),
+    ('KZN', 'KwaZulu-Natal'),
+    ('NW', 'North West'),
+    ('GP', 'Gauteng'),
+    ('MP', 'Mpumalanga'),
+    ('LIM', 'Limpopo'),
+)
+
+# 5-digit ward id prefix (province, district, municipality) -> (municipality code, name)
+BUNDLED_MUNICIPALITIES = {
+    19100: ('CPT', 'City of Cape Town'),
+    29300: ('NMA', 'Nelson Mandela Bay'),
+    59500: ('ETH', 'eThekwini'),
+    79700: ('EKU', 'City of Ekurhuleni'),
+    79800: ('JHB', 'City of Johannesburg'),
+    79900: ('TSH', 'City of Tshwane'),
+}
+
+PREFIX_DIGITS = 5
+PREFIX_SLOTS = 10 ** PREFIX_DIGITS
+
+PROVINCE_ALIASES = {
+    'northern province': 'LIM',
+    'kwazulu natal': 'KZN',
+    'natal': 'KZN',
+    'gauteng province': 'GP',
+}
+
+WARD_ID_PATTERN = re.compile(r'\b(\d{8})\b')
+# "JHB - City of Johannesburg" style municipality text
+CODED_NAME_PATTERN = re.compile(r'^([A-Z]{2,4}\d{0,3})\s*-\s*(.+)$')
+
+
+def _alias_key(text):
+    return ' '.join(text.lower().replace('-', ' ').split())
+
+
+@dataclass(frozen=True)
+class Ward:
+    """Canonical location of a ward; fields the index could not resolve are NOT_FOUND"""
+    ward_id: str = NOT_FOUND
+    ward_no: str = NOT_FOUND
+    municipality_code: str = NOT_FOUND
+    municipality: str = NOT_FOUND
+    province_code: str = NOT_FOUND
+    province: str = NOT_FOUND
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class WardIndex:
+    """Compact prefix -> municipality table plus name aliases for text without a ward id"""
+
+    def __init__(self, municipalities=None):
+        self.municipalities = [None]  # slot 0 means unknown
+        self.by_prefix = array('H', bytes(2 * PREFIX_SLOTS))
+        self.province_aliases = dict(PROVINCE_ALIASES)
+        self.province_names = {code: name for code, name in filter(None, PROVINCES)}
+        for code, name in self.province_names.items():
+            self.province_aliases[_alias_key(code)] = code
+            self.province_aliases[_alias_key(name)] = code
+        self.municipality_aliases = {}
+        for prefix, (code, name) in (municipalities or BUNDLED_MUNICIPALITIES).items():
+            self.add(prefix, code, name)
+
+    def add(self, prefix, code, name):
+        prefix = int(prefix)
+        if not PREFIX_SLOTS // 10 <= prefix < PREFIX_SLOTS:
+            raise ValueError(f"Ward id prefix must be {PREFIX_DIGITS} digits, got {prefix}")
+        self.municipalities.append((code, name))
+        self.by_prefix[prefix] = len(self.municipalities) - 1
+        self.municipality_aliases[_alias_key(code)] = prefix
+        self.municipality_aliases[_alias_key(name)] = prefix
+        if name.lower().startswith('city of '):
+            self.municipality_aliases[_alias_key(name[len('city of '):])] = prefix
+
+    @classmethod
+    def load(cls, path=None):
+        """Bundled metros (see BUNDLED_MUNICIPALITIES), extended by a CSV of prefix,code,name rows if a path is given"""
+        index = cls()
+        if path:
+            with open(path, newline='') as f:
+                for row in csv.DictReader(f):
+                    index.add(row['prefix'], row['code'].strip(), row['name'].strip())
+        return index
+
+    def municipality_for_prefix(self, prefix):
+        slot = self.by_prefix[prefix]
+        return self.municipalities[slot] if slot else None
+
+    def normalise(self, text):
+        """Map scraped ward text to a canonical Ward"""
+        if not text:
+            return Ward()
+        province_code = municipality_code = municipality = NOT_FOUND
+        ward_id = ward_no = NOT_FOUND
+
+        match = WARD_ID_PATTERN.search(text)
+        if match:
+            ward_id = match.group(1)
+            ward_no = str(int(ward_id[5:]))
+            province = PROVINCES[int(ward_id[0])]
+            if province:
+                province_code = province[0]
+            known = self.municipality_for_prefix(int(ward_id[:PREFIX_DIGITS]))
+            if known:
+                municipality_code, municipality = known
+
+        # Fall back to the comma-separated names for anything the id did not settle
+        for part in (part.strip() for part in text.split(',')):
+            if not part or part == ward_id or WARD_ID_PATTERN.search(part):
+                continue
+            if province_code == NOT_FOUND and _alias_key(part) in self.province_aliases:
+                province_code = self.province_aliases[_alias_key(part)]
+                continue
+            if municipality_code != NOT_FOUND:
+                continue
+            coded = CODED_NAME_PATTERN.match(part)
+            code, name = (coded.group(1), coded.group(2).strip()) if coded else (None, part)
+            prefix = self.municipality_aliases.get(_alias_key(code or name))
+            if prefix is None and code:
+                prefix = self.municipality_aliases.get(_alias_key(name))
+            if prefix is not None:
+                municipality_code, municipality = self.municipality_for_prefix(prefix)
+            elif code:
+                municipality_code, municipality = code, name
+
+        return Ward(
+            ward_id=ward_id,
+            ward_no=ward_no,
+            municipality_code=municipality_code,
+            municipality=municipality,
+            province_code=province_code,
+            province=self.province_names.get(province_code, NOT_FOUND),
+        )
+
+
+INDEX = WardIndex.load(os.getenv('WARD_INDEX_PATH'))
+
+
+@lru_cache(maxsize=20000)
+def normalise_ward(text):
+    """Canonical Ward for scraped ward text, using the process-wide index (cached per distinct text)"""
+    return INDEX.normalise(text)
+
+
+OUTPUT_FIELDS = ['ward_id', 'ward_no', 'municipality_code', 'municipality', 'province_code', 'province']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add canonical ward, municipality and province columns to captured records")
+    parser.add_argument('path', nargs='?', help="CSV of records (default: stdin)")
+    parser.add_argument('--column', default='ward', help="CSV column holding the scraped ward text")
+    args = parser.parse_args(argv)
+
+    stream = open(args.path, newline='') if args.path else sys.stdin
+    rows = unresolved = 0
+    try:
+        reader = csv.DictReader(stream)
+        fields = list(reader.fieldnames or [])
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields + [f for f in OUTPUT_FIELDS if f not in fields])
+        writer.writeheader()
+        for row in reader:
+            ward = normalise_ward((row.get(args.column) or '').strip())
+            rows += 1
+            if ward.municipality_code == NOT_FOUND:
+                unresolved += 1
+            row.update(ward.to_dict())
+            writer.writerow(row)
+    finally:
+        if args.path:
+            stream.close()
+
+    print(f"Normalised {rows} records: {unresolved} without a known municipality", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -212,6 +212,26 @@ async function verifyWithIEC(idNumber) {
             body: JSON.stringify({ id_number: idNumber })
         });
         
+        if (response.status === 429) {
+            const busy = await response.json().catch(() => ({}));
+            const retryAfter = response.headers.get('Retry-After') || busy.retry_after || '30';
+            verifyBtn.disabled = false;
+            verifyBtn.classList.remove('btn-loading');
+            verifyBtnText.textContent = 'Verify with IEC';
+            showNotification(`⏳ IEC verification is busy. Please try again in ${retryAfter} seconds.`, 'warning');
+            return null;
+        }
+        
+        if (response.status === 400) {
+            // The ID itself was rejected (bad date, citizenship or check digit): no point simulating
+            const invalid = await response.json().catch(() => ({}));
+            verifyBtn.disabled = false;
+            verifyBtn.classList.remove('btn-loading');
+            verifyBtnText.textContent = 'Verify with IEC';
+            showNotification('❌ ' + (invalid.error || 'Invalid ID number'), 'error');
+            return null;
+        }
+        
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }